@@ -189,9 +189,9 @@ class Zonos(nn.Module):
         "Prefill" mode: we already have `prefix_hidden_states`, and we want
         to append new embeddings, then compute the logits.
         """
-        # Replicate input_ids if CFG is enabled
+        # Replicate input_ids if CFG is enabled (cond batch, then uncond batch)
         if cfg_scale != 1.0:
-            input_ids = input_ids.expand(prefix_hidden_states.shape[0], -1, -1)
+            input_ids = input_ids.repeat(prefix_hidden_states.shape[0] // input_ids.shape[0], 1, 1)
         hidden_states = torch.cat([prefix_hidden_states, self.embed_codes(input_ids)], dim=1)
         return self._compute_logits(hidden_states, inference_params, cfg_scale)
 
@@ -10,6 +10,8 @@ load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:port")
 DATABASE_NAME = os.getenv("MONGO_DB_NAME", "Tallo")
+# 커넥션 풀 크기 (클라이언트는 앱 전체에서 하나만 만들어 재사용)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
 
 # Async 클라이언트 (FastAPI용)
 class MongoDatabase:
@@ -19,14 +21,17 @@ class MongoDatabase:
 
 async def connect_to_mongo():
     """MongoDB 연결"""
-    MongoDatabase.client = AsyncIOMotorClient(MONGO_URI)
+    if MongoDatabase.client is None:
+        MongoDatabase.client = AsyncIOMotorClient(MONGO_URI, maxPoolSize=MONGO_MAX_POOL_SIZE)
     MongoDatabase.database = MongoDatabase.client[DATABASE_NAME]
     MongoDatabase.gridfs_bucket = AsyncIOMotorGridFSBucket(MongoDatabase.database)
     print(f"✅ Connected to MongoDB: {DATABASE_NAME}")
 
 async def close_mongo_connection():
     """MongoDB 연결 종료"""
-    MongoDatabase.client.close()
+    if MongoDatabase.client is not None:
+        MongoDatabase.client.close()
+        MongoDatabase.client = None
     print("❌ Closed MongoDB connection")
 
 def get_database():
@@ -49,4 +49,26 @@ class AudioCacheDB(BaseModel):
     
     class Config:
         json_encoders = {ObjectId: str}
+        populate_by_name = True
+
+class LLMCacheDB(BaseModel):
+    """LLM 응답 캐시 문서 (created_at TTL 인덱스로 만료)"""
+    id: str = Field(..., alias="_id")  # 프롬프트 SHA-256
+    text: str
+    audio_url: Optional[str] = None
+    audio_urls: List[str] = []  # 문장별 TTS URL
+    created_at: datetime
+    
+    class Config:
+        populate_by_name = True
+
+class LLMSessionDB(BaseModel):
+    """대화 세션별 Assistant thread 매핑 (expires_at TTL 인덱스로 만료)"""
+    id: str = Field(..., alias="_id")  # "{session_id}:{assistant_id}"
+    session_id: str
+    assistant_id: str
+    thread_id: str
+    expires_at: datetime
+    
+    class Config:
         populate_by_name = True
\ No newline at end of file
@@ -1,18 +1,33 @@
 """
 MongoDB 데이터 접근 레이어
 """
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 from typing import List, Optional
+from datetime import datetime, timedelta
 from bson import ObjectId
 import torch
 import io
+from pathlib import Path
 
-from .model import CharacterDB, StorybookDB, AudioCacheDB
+from .model import CharacterDB, StorybookDB, AudioCacheDB, LLMCacheDB, LLMSessionDB
+
+# 임베딩 압축 (선택사항 - 없으면 압축하지 않고 저장)
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+EMBEDDING_ZSTD_LEVEL = 5
+
+# 참조 오디오 GridFS 청크 크기 (파일 전체를 메모리에 올리지 않고 이 단위로 업로드)
+REFERENCE_AUDIO_CHUNK_SIZE = 256 * 1024
 
 class CharacterRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["characters"]
         self.gridfs = db.fs  # GridFS
+        self.bucket = AsyncIOMotorGridFSBucket(db)  # 호출마다 새로 만들지 않고 재사용
     
     async def get_all(self) -> List[CharacterDB]:
         """모든 캐릭터 조회"""
@@ -36,29 +51,61 @@ class CharacterRepository:
             return CharacterDB(**char)
         return None
     
+    async def save_character(self, character: CharacterDB) -> None:
+        """캐릭터 문서 저장 (같은 character_id가 있으면 덮어씀)"""
+        await self.collection.replace_one(
+            {"character_id": character.character_id},
+            character.dict(by_alias=True, exclude={"id"}),
+            upsert=True
+        )
+    
     async def save_embedding(self, character_id: str, embedding: torch.Tensor) -> str:
-        """임베딩을 GridFS에 저장"""
+        """임베딩을 GridFS에 저장 (zstandard가 있으면 zstd 압축)"""
         buffer = io.BytesIO()
         torch.save(embedding, buffer)
-        buffer.seek(0)
+        data = buffer.getvalue()
         
-        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
-        bucket = AsyncIOMotorGridFSBucket(self.collection.database)
+        metadata = {"character_id": character_id, "type": "embedding"}
+        if ZSTD_AVAILABLE:
+            data = zstd.ZstdCompressor(level=EMBEDDING_ZSTD_LEVEL).compress(data)
+            metadata["compression"] = "zstd"
         
-        file_id = await bucket.upload_from_stream(
+        file_id = await self.bucket.upload_from_stream(
             f"{character_id}_embedding.pt",
-            buffer,
-            metadata={"character_id": character_id, "type": "embedding"}
+            data,
+            metadata=metadata
         )
         return str(file_id)
     
-    async def load_embedding(self, file_id: str) -> torch.Tensor:
-        """GridFS에서 임베딩 로드"""
-        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
-        bucket = AsyncIOMotorGridFSBucket(self.collection.database)
+    async def save_reference_audio(self, character_id: str, audio_path: Path) -> str:
+        """
+        참조 오디오 파일을 GridFS에 저장하고 file_id 반환 (reference_audio_id에 기록)
         
-        grid_out = await bucket.open_download_stream(ObjectId(file_id))
+        파일 객체를 그대로 넘겨 REFERENCE_AUDIO_CHUNK_SIZE 단위로 읽으므로
+        파일 크기와 관계없이 메모리 사용량이 청크 하나로 제한됩니다.
+        """
+        audio_path = Path(audio_path)
+        with open(audio_path, "rb") as audio_file:
+            file_id = await self.bucket.upload_from_stream(
+                audio_path.name,
+                audio_file,
+                chunk_size_bytes=REFERENCE_AUDIO_CHUNK_SIZE,
+                metadata={"character_id": character_id, "type": "reference_audio"}
+            )
+        await self.collection.update_one(
+            {"character_id": character_id},
+            {"$set": {"reference_audio_id": str(file_id)}}
+        )
+        return str(file_id)
+    
+    async def load_embedding(self, file_id: str) -> torch.Tensor:
+        """GridFS에서 임베딩 로드 (metadata.compression에 따라 압축 해제)"""
+        grid_out = await self.bucket.open_download_stream(ObjectId(file_id))
         data = await grid_out.read()
+        if (grid_out.metadata or {}).get("compression") == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstd로 압축된 임베딩입니다. 'pip install zstandard'를 실행하세요.")
+            data = zstd.ZstdDecompressor().decompress(data)
         buffer = io.BytesIO(data)
         embedding = torch.load(buffer, map_location='cpu')
         return embedding
@@ -79,6 +126,24 @@ class StorybookRepository:
             result.append(StorybookDB(**story))
         return result
     
+    async def list_recent(self, limit: int) -> List[StorybookDB]:
+        """최신순(_id 내림차순)으로 limit개만 조회 (정렬/제한은 MongoDB에서 처리)"""
+        # MongoDB에서 limit(0)은 "제한 없음", 음수는 단일 배치 반환이므로 직접 처리
+        if limit <= 0:
+            return []
+        cursor = self.collection.find().sort("_id", -1).limit(limit)
+        result = []
+        async for story in cursor:
+            # ObjectId를 문자열로 변환
+            if "_id" in story and isinstance(story["_id"], ObjectId):
+                story["_id"] = str(story["_id"])
+            result.append(StorybookDB(**story))
+        return result
+    
+    async def count(self) -> int:
+        """전체 동화책 개수 (컬렉션 메타데이터 기반 추정치)"""
+        return await self.collection.estimated_document_count()
+    
     async def get_by_id(self, story_id: str) -> Optional[StorybookDB]:
         """동화책 ID로 조회"""
         story = await self.collection.find_one({"_id": ObjectId(story_id)})
@@ -119,6 +184,7 @@ class AudioCacheRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["audio_cache"]
         self.db = db
+        self.bucket = AsyncIOMotorGridFSBucket(db)  # 호출마다 새로 만들지 않고 재사용
     
     async def find_cache(self, character_id: str, story_id: str, chunk_index: int) -> Optional[AudioCacheDB]:
         """캐시된 오디오 찾기"""
@@ -160,9 +226,7 @@ class AudioCacheRepository:
         metadata: dict
     ) -> str:
         """오디오를 GridFS에 저장하고 file_id 반환"""
-        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
-        bucket = AsyncIOMotorGridFSBucket(self.db)
-        file_id = await bucket.upload_from_stream(
+        file_id = await self.bucket.upload_from_stream(
             filename,
             audio_data,
             metadata=metadata
@@ -171,12 +235,14 @@ class AudioCacheRepository:
     
     async def load_audio_from_gridfs(self, file_id: str) -> bytes:
         """GridFS에서 오디오 다운로드"""
-        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
-        bucket = AsyncIOMotorGridFSBucket(self.db)
-        grid_out = await bucket.open_download_stream(ObjectId(file_id))
+        grid_out = await self.bucket.open_download_stream(ObjectId(file_id))
         audio_data = await grid_out.read()
         return audio_data
     
+    async def open_audio_stream(self, file_id: str):
+        """GridFS 오디오 다운로드 스트림 열기 (readchunk()로 청크 단위 읽기)"""
+        return await self.bucket.open_download_stream(ObjectId(file_id))
+    
     async def find_audio_in_gridfs(self, character_id: str, story_id: str, page_num: int) -> Optional[str]:
         """GridFS에서 메타데이터로 오디오 파일 찾기 (audio_cache 없이도 작동)"""
         # GridFS files 컬렉션에서 직접 검색
@@ -192,4 +258,85 @@ class AudioCacheRepository:
         
         if file_doc and "_id" in file_doc:
             return str(file_doc["_id"])
-        return None
\ No newline at end of file
+        return None
+
+class LLMCacheRepository:
+    """LLM 질문/마무리 멘트 응답 캐시 (LLMService.response_store로 사용)"""
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["llm_cache"]
+    
+    async def create_ttl_index(self, expire_after_seconds: int):
+        """created_at 기준 TTL 인덱스 생성 (만료된 캐시는 MongoDB가 자동 삭제)"""
+        await self.collection.create_index(
+            "created_at",
+            expireAfterSeconds=expire_after_seconds,
+            name="llm_cache_ttl"
+        )
+    
+    async def get(self, key: str) -> Optional[dict]:
+        """캐시된 응답 조회"""
+        doc = await self.collection.find_one({"_id": key})
+        if doc:
+            cache = LLMCacheDB(**doc)
+            return {"text": cache.text, "audio_url": cache.audio_url, "audio_urls": cache.audio_urls}
+        return None
+    
+    async def set(self, key: str, response: dict):
+        """응답 저장 (같은 키가 있으면 덮어씀)"""
+        cache = LLMCacheDB(
+            _id=key,
+            text=response["text"],
+            audio_url=response.get("audio_url"),
+            audio_urls=response.get("audio_urls", []),
+            created_at=datetime.utcnow()
+        )
+        await self.collection.replace_one(
+            {"_id": key},
+            cache.dict(by_alias=True),
+            upsert=True
+        )
+
+class LLMSessionRepository:
+    """대화 세션별 Assistant thread 매핑 (LLMService.thread_store로 사용)"""
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["llm_sessions"]
+    
+    async def create_ttl_index(self):
+        """expires_at 기준 TTL 인덱스 생성 (만료 시각이 지나면 MongoDB가 자동 삭제)"""
+        await self.collection.create_index(
+            "expires_at",
+            expireAfterSeconds=0,
+            name="llm_sessions_ttl"
+        )
+    
+    async def get_session(self, session_id: str, assistant_id: str) -> Optional[LLMSessionDB]:
+        """만료되지 않은 세션 매핑 조회 (TTL 삭제는 최대 1분 늦을 수 있으므로 expires_at도 확인)"""
+        doc = await self.collection.find_one({
+            "_id": f"{session_id}:{assistant_id}",
+            "expires_at": {"$gt": datetime.utcnow()}
+        })
+        if doc:
+            return LLMSessionDB(**doc)
+        return None
+    
+    async def set_thread_id(self, session_id: str, assistant_id: str, thread_id: str, ttl_seconds: int):
+        """세션의 thread ID 저장 (같은 키가 있으면 덮어씀)"""
+        session = LLMSessionDB(
+            _id=f"{session_id}:{assistant_id}",
+            session_id=session_id,
+            assistant_id=assistant_id,
+            thread_id=thread_id,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        )
+        await self.collection.replace_one(
+            {"_id": session.id},
+            session.dict(by_alias=True),
+            upsert=True
+        )
+    
+    async def delete(self, session_id: str, assistant_id: Optional[str] = None):
+        """세션 매핑 삭제 (assistant_id가 없으면 세션의 모든 매핑)"""
+        if assistant_id is None:
+            await self.collection.delete_many({"session_id": session_id})
+        else:
+            await self.collection.delete_one({"_id": f"{session_id}:{assistant_id}"})
@@ -4,20 +4,29 @@ Zonos Multi-Character TTS API Server
 """
 
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, TYPE_CHECKING
 import torch
 import torchaudio
 import tempfile
+import asyncio
 import os
-import json
+import orjson
 import io
+import uuid
+import queue
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import soundfile as sf  # torchaudio 버그 우회용
+from safetensors.torch import save_file, load_file
 
 from zonos.model import Zonos
 from zonos.conditioning import make_cond_dict
@@ -43,19 +52,27 @@ except ImportError as e:
 MONGODB_AVAILABLE = False
 
 if TYPE_CHECKING:
-    from .db.repo import CharacterRepository, StorybookRepository, AudioCacheRepository
-    from .db.model import StorybookDB
+    from .db.repo import CharacterRepository, StorybookRepository, AudioCacheRepository, LLMCacheRepository, LLMSessionRepository
+    from .db.model import StorybookDB, CharacterDB
 
 try:
     from .db.db_client import connect_to_mongo, close_mongo_connection, get_database
-    from .db.repo import CharacterRepository, StorybookRepository, AudioCacheRepository
-    from .db.model import StorybookDB, AudioCacheDB
+    from .db.repo import CharacterRepository, StorybookRepository, AudioCacheRepository, LLMCacheRepository, LLMSessionRepository
+    from .db.model import StorybookDB, AudioCacheDB, CharacterDB
     from bson import ObjectId
     MONGODB_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ MongoDB 모듈을 불러올 수 없습니다: {e}")
     print("⚠️ MongoDB 기능을 사용하려면 'pip install motor pymongo'를 실행하세요.")
 
+# Redis 작업 큐 지원 (선택사항 - REDIS_URL 설정 시 장시간 TTS 작업을 백그라운드 워커로 처리)
+REDIS_AVAILABLE = False
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    print("⚠️ Redis 모듈을 불러올 수 없습니다. TTS 작업 큐를 사용하려면 'pip install redis'를 실행하세요.")
+
 # torch.compile 비활성화 (Windows 컴파일러 없음)
 import torch._dynamo
 import sys
@@ -112,7 +129,8 @@ if "PHONEMIZER_ESPEAK_PATH" not in os.environ:
 app = FastAPI(
     title="Zonos Multi-Character TTS API",
     version="2.0.0",
-    description="다중 캐릭터 음성 생성 및 관리 시스템"
+    description="다중 캐릭터 음성 생성 및 관리 시스템",
+    default_response_class=ORJSONResponse  # 캐릭터/동화 목록 직렬화를 orjson으로 처리
 )
 
 # CORS 설정 (React와 통신 + ngrok)
@@ -135,14 +153,65 @@ for directory in [EMBEDDINGS_DIR, REFERENCE_DIR, OUTPUTS_DIR]:
 # 캐릭터 메타데이터 파일
 CHARACTERS_DB = EMBEDDINGS_DIR / "characters.json"
 
+# safetensors 임베딩 파일 내부의 텐서 키
+EMBEDDING_TENSOR_KEY = "emb"
+
+# GPU에서 동시에 실행할 TTS 생성 수 (GPU 메모리 여유에 맞게 조정)
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "2"))
+tts_semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+
+# 업로드 파일을 디스크로 옮길 때 한 번에 읽는 크기
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# 한 번의 model.generate에 묶을 최대 페이지 수 (GPU 메모리에 맞게 조정)
+TTS_MAX_BATCH_SIZE = int(os.getenv("TTS_MAX_BATCH_SIZE", "8"))
+
+# characters.json 저장 지연 시간 (초) - 연속된 변경을 한 번의 쓰기로 합침
+CHARACTERS_DB_FLUSH_DELAY = 0.2
+
+# 디스크 I/O(sf.write, 오디오 로드, characters.json 저장) 전용 스레드 풀
+# startup에서 만들고 shutdown에서 닫음 (None이면 run_in_executor가 기본 풀 사용)
+IO_POOL_WORKERS = 4
+IO_POOL: Optional[ThreadPoolExecutor] = None
+
+# 페이지별 생성 루프 로그 (startup에서 QueueHandler를 붙여 별도 스레드에서 출력)
+logger = logging.getLogger(__name__)
+LOG_LEVEL = os.getenv("TTS_LOG_LEVEL", "INFO")
+log_listener: Optional[QueueListener] = None
+
+# 캐릭터별 캐시 최대 항목 수 (LRU, 캐릭터 삭제 시 해당 캐릭터 항목만 제거)
+EMBEDDING_CACHE_SIZE = 64
+CONDITIONING_CACHE_SIZE = 256
+
 # 전역 변수
 model = None
 characters_db: Dict = {}  # 로컬 캐릭터 DB (하위 호환)
+_characters_db_flush_task: Optional[asyncio.Task] = None  # 지연 대기 중인(아직 스냅샷 전) 저장 작업
+_characters_db_flush_tasks: set = set()  # 끝나지 않은 모든 저장 작업 (쓰기 중인 작업 포함)
+_characters_db_write_lock = asyncio.Lock()
+
+# 생성 중인 페이지 (character_id, story_id, page) -> 완료 Event
+# 같은 페이지를 동시에 요청하면 하나만 생성하고 나머지는 완료를 기다림
+_inflight_pages: Dict[tuple, asyncio.Event] = {}
+
+# Redis 작업 큐 설정
+REDIS_URL = os.getenv("REDIS_URL")
+TTS_QUEUE_KEY = "queue:tts:global"
+TTS_TASK_RESULT_TTL = 60 * 60  # 작업 결과 보관 시간 (초)
+
+# Redis 클라이언트 및 워커 (startup에서 초기화)
+redis_client = None
+tts_worker_task: Optional[asyncio.Task] = None
 
 # Repository 인스턴스 (startup에서 초기화)
 character_repo: Optional["CharacterRepository"] = None
 storybook_repo: Optional["StorybookRepository"] = None
 audio_cache_repo: Optional["AudioCacheRepository"] = None
+llm_cache_repo: Optional["LLMCacheRepository"] = None
+llm_session_repo: Optional["LLMSessionRepository"] = None
+
+# LLM 응답 캐시 보관 기간 (초, MongoDB TTL 인덱스)
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
 
 # ==================== 데이터 모델 ====================
 
@@ -184,11 +253,13 @@ class LLMChatRequest(BaseModel):
     system_prompt: Optional[str] = Field(None, description="시스템 프롬프트 (선택)")
     return_audio: bool = Field(True, description="TTS 오디오도 함께 반환할지 여부")
     current_page_text: Optional[str] = Field(None, description="현재 동화책 페이지 내용 (선택)")
+    session_id: Optional[str] = Field(None, description="대화 세션 ID (같은 세션은 Assistant 대화 이어가기)")
 
 class LLMChatResponse(BaseModel):
     """LLM 채팅 응답"""
     text: str
-    audio_url: Optional[str] = None  # TTS 생성된 오디오 URL
+    audio_url: Optional[str] = None  # TTS 생성된 오디오 URL (응답 전체)
+    audio_urls: List[str] = []  # 문장별 오디오 URL (순서대로 재생)
 
 class StoryInfo(BaseModel):
     """동화 정보 (MongoDB)"""
@@ -211,39 +282,134 @@ def load_characters_db():
     """캐릭터 데이터베이스 로드"""
     global characters_db
     if CHARACTERS_DB.exists():
-        with open(CHARACTERS_DB, 'r', encoding='utf-8') as f:
-            characters_db = json.load(f)
+        with open(CHARACTERS_DB, 'rb') as f:
+            characters_db = orjson.loads(f.read())
     else:
         characters_db = {}
     return characters_db
 
-def save_characters_db():
-    """캐릭터 데이터베이스 저장"""
-    with open(CHARACTERS_DB, 'w', encoding='utf-8') as f:
-        json.dump(characters_db, f, indent=2, ensure_ascii=False)
+def save_characters_db(snapshot: Optional[Dict] = None):
+    """캐릭터 데이터베이스 저장 (임시 파일에 쓴 뒤 교체)"""
+    data = characters_db if snapshot is None else snapshot
+    temp_path = CHARACTERS_DB.with_suffix(".json.tmp")
+    # orjson은 항상 UTF-8로 출력 (json의 ensure_ascii=False와 동일)
+    with open(temp_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(temp_path, CHARACTERS_DB)
+
+async def _flush_characters_db_later():
+    """지연 후 현재 캐릭터 DB 스냅샷을 스레드에서 저장"""
+    global _characters_db_flush_task
+    await asyncio.sleep(CHARACTERS_DB_FLUSH_DELAY)
+    # 스냅샷 이후의 변경은 새 저장 작업으로 예약되도록 먼저 비움
+    _characters_db_flush_task = None
+    snapshot = dict(characters_db)
+    async with _characters_db_write_lock:
+        await asyncio.get_running_loop().run_in_executor(IO_POOL, save_characters_db, snapshot)
+
+def schedule_save_characters_db():
+    """
+    캐릭터 데이터베이스 저장 예약
+    
+    메모리의 characters_db가 기준이며, CHARACTERS_DB_FLUSH_DELAY 안에 들어온
+    여러 변경은 한 번의 파일 쓰기로 합쳐집니다.
+    """
+    global _characters_db_flush_task
+    if _characters_db_flush_task is None:
+        _characters_db_flush_task = asyncio.get_running_loop().create_task(_flush_characters_db_later())
+        # 스냅샷을 뜬 뒤 쓰기를 기다리는 동안에도 flush_characters_db가 기다릴 수 있도록 끝날 때까지 보관
+        _characters_db_flush_tasks.add(_characters_db_flush_task)
+        _characters_db_flush_task.add_done_callback(_characters_db_flush_tasks.discard)
+
+async def flush_characters_db():
+    """예약되었거나 쓰는 중인 캐릭터 DB 저장이 모두 완료될 때까지 대기"""
+    while _characters_db_flush_tasks:
+        await asyncio.gather(*_characters_db_flush_tasks)
 
 def get_embedding_path(character_id: str) -> Path:
-    """캐릭터 임베딩 파일 경로"""
+    """캐릭터 임베딩 파일 경로 (safetensors)"""
+    return EMBEDDINGS_DIR / f"{character_id}.safetensors"
+
+def get_legacy_embedding_path(character_id: str) -> Path:
+    """구버전 torch.save(.pt) 임베딩 파일 경로 (하위 호환)"""
     return EMBEDDINGS_DIR / f"{character_id}.pt"
 
+def save_character_embedding(character_id: str, embedding: torch.Tensor) -> Path:
+    """캐릭터 임베딩을 safetensors 형식으로 저장"""
+    embedding_path = get_embedding_path(character_id)
+    save_file({EMBEDDING_TENSOR_KEY: embedding.detach().cpu().contiguous()}, str(embedding_path))
+    return embedding_path
+
+# character_id -> 임베딩, (character_id, language, ...) -> conditioning 구간
+# IO_POOL/TTS 스레드에서 함께 접근하므로 _character_cache_lock으로 보호
+_embedding_cache: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+_conditioning_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_character_cache_lock = threading.Lock()
+
+def _character_cache_get(cache: OrderedDict, key):
+    """캐시 조회 (있으면 최근 사용으로 이동, 없으면 None)"""
+    with _character_cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+def _character_cache_put(cache: OrderedDict, key, value, max_size: int):
+    """캐시 저장 (max_size 초과 시 가장 오래 안 쓴 항목 제거)"""
+    with _character_cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+def evict_character_caches(character_id: str):
+    """캐릭터 하나의 임베딩/conditioning 캐시만 제거 (다른 캐릭터 캐시는 유지)"""
+    with _character_cache_lock:
+        _embedding_cache.pop(character_id, None)
+        for key in [key for key in _conditioning_cache if key[0] == character_id]:
+            del _conditioning_cache[key]
+
 def load_character_embedding(character_id: str) -> torch.Tensor:
-    """캐릭터 임베딩 로드"""
+    """
+    캐릭터 임베딩 로드 (safetensors mmap 우선, 없으면 구버전 .pt)
+    
+    같은 캐릭터로 여러 페이지/대화를 생성하므로 character_id 단위로 캐시합니다.
+    반환된 텐서는 캐시와 공유되므로 in-place로 수정하면 안 됩니다.
+    """
+    cached = _character_cache_get(_embedding_cache, character_id)
+    if cached is not None:
+        return cached
+    
     embedding_path = get_embedding_path(character_id)
-    if not embedding_path.exists():
+    legacy_path = get_legacy_embedding_path(character_id)
+    if not embedding_path.exists() and not legacy_path.exists():
         raise HTTPException(status_code=404, detail=f"Character '{character_id}' not found")
     
     try:
-        embedding = torch.load(embedding_path, map_location=device)
-        return embedding
+        if embedding_path.exists():
+            # pickle 없이 mmap된 파일에서 바로 디바이스로 복사
+            embedding = load_file(str(embedding_path), device=str(device))[EMBEDDING_TENSOR_KEY]
+        else:
+            embedding = torch.load(legacy_path, map_location=device)
+        # 모델 가중치와 같은 dtype(BF16)으로 맞춤 (구버전 FP32 임베딩 대비)
+        embedding = embedding.to(dtype=torch.bfloat16)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load embedding: {str(e)}")
+    
+    _character_cache_put(_embedding_cache, character_id, embedding, EMBEDDING_CACHE_SIZE)
+    return embedding
+
+async def load_character_embedding_async(character_id: str) -> torch.Tensor:
+    """load_character_embedding을 IO_POOL에서 실행 (캐시 미스 시 파일 로드가 이벤트 루프를 막지 않도록)"""
+    return await asyncio.get_running_loop().run_in_executor(IO_POOL, load_character_embedding, character_id)
 
 def generate_character_id(name: str) -> str:
     """캐릭터 ID 생성 (고유 ID)"""
     import hashlib
     timestamp = datetime.now().isoformat()
     unique_string = f"{name}_{timestamp}"
-    return hashlib.md5(unique_string.encode()).hexdigest()[:12]
+    # SHA-256: SHA-NI 가속 경로 사용, FIPS 환경에서도 허용 (48비트 prefix 충돌 가능성은 무시 가능)
+    return hashlib.sha256(unique_string.encode()).hexdigest()[:12]
 
 def format_datetime_to_string(dt) -> Optional[str]:
     """
@@ -362,6 +528,27 @@ def save_audio_file(wavs: torch.Tensor, sampling_rate: int, output_path: Path):
     """오디오 파일 저장 (torchaudio 버그 우회)"""
     sf.write(str(output_path), wavs[0].squeeze(0).numpy(), sampling_rate)
 
+def load_audio_file(path: str) -> tuple[torch.Tensor, int]:
+    """
+    오디오 파일 로드 ([channels, frames] float32, torchaudio.load와 같은 형태)
+    
+    soundfile로 float32 numpy 배열을 읽어 복사 없이 텐서로 감싸고,
+    libsndfile이 읽지 못하는 포맷만 torchaudio로 폴백합니다.
+    """
+    try:
+        data, sampling_rate = sf.read(path, dtype="float32", always_2d=True)
+    except sf.LibsndfileError:
+        return torchaudio.load(path)
+    return torch.from_numpy(data.T), sampling_rate
+
+async def save_audio_file_async(wavs: torch.Tensor, sampling_rate: int, output_path: Path):
+    """save_audio_file을 IO_POOL에서 실행 (이벤트 루프 블로킹 방지)"""
+    await asyncio.get_running_loop().run_in_executor(IO_POOL, save_audio_file, wavs, sampling_rate, output_path)
+
+async def load_audio_file_async(path: str) -> tuple[torch.Tensor, int]:
+    """load_audio_file을 IO_POOL에서 실행 (이벤트 루프 블로킹 방지)"""
+    return await asyncio.get_running_loop().run_in_executor(IO_POOL, load_audio_file, path)
+
 def convert_audio_to_bytes(wavs: torch.Tensor, sampling_rate: int) -> bytes:
     """오디오 텐서를 WAV 바이트로 변환"""
     buffer = io.BytesIO()
@@ -369,17 +556,35 @@ def convert_audio_to_bytes(wavs: torch.Tensor, sampling_rate: int) -> bytes:
     buffer.seek(0)
     return buffer.read()
 
-def generate_tts_audio(text: str, speaker_embedding: torch.Tensor, language: str = "ko", 
-                       speaking_rate: float = 15.0, pitch_std: float = 30.0,
-                       emotion: Optional[str] = None) -> torch.Tensor:
-    """TTS 오디오 생성"""
+def copy_audio_to_host(wavs: torch.Tensor) -> torch.Tensor:
+    """
+    GPU 오디오 텐서를 pinned 메모리로 복사 (블로킹 .cpu() 대체)
+
+    pinned 버퍼는 PyTorch의 caching host allocator에서 재사용되므로
+    매 요청마다 page-locked 메모리를 새로 할당하지 않습니다.
+    """
+    if wavs.device.type != "cuda":
+        return wavs.cpu()
+
+    host_wavs = torch.empty(wavs.shape, dtype=wavs.dtype, pin_memory=True)
+    host_wavs.copy_(wavs, non_blocking=True)
+    # sf.write가 버퍼를 읽기 전에 현재 스트림의 복사만 완료되면 됨 (디바이스 전체 동기화 불필요)
+    torch.cuda.current_stream(wavs.device).synchronize()
+    return host_wavs
+
+def build_cond_dict(texts: List[str], speaker_embedding: torch.Tensor, language: str = "ko",
+                    speaking_rate: float = 15.0, pitch_std: float = 30.0,
+                    emotion: Optional[str] = None) -> dict:
+    """Zonos conditioning 입력 dict 생성 (texts 개수만큼 espeak 배치)"""
     cond_dict = make_cond_dict(
-        text=text,
+        text=texts[0],
         speaker=speaker_embedding,
         language=language,
         speaking_rate=speaking_rate,
         pitch_std=pitch_std
     )
+    # espeak 조건만 배치 크기만큼, 나머지 조건은 PrefixConditioner가 batch로 broadcast
+    cond_dict["espeak"] = (list(texts), [language] * len(texts))
     
     # 감정 추가 (선택적)
     if emotion:
@@ -393,16 +598,140 @@ def generate_tts_audio(text: str, speaker_embedding: torch.Tensor, language: str
         if emotion_key:
             cond_dict[emotion_key] = 0.7
     
-    conditioning = model.prepare_conditioning(cond_dict)
+    return cond_dict
+
+def _conditioning_segment(conditioner, value) -> torch.Tensor:
+    """conditioner 하나의 출력에 PrefixConditioner의 project/norm 적용"""
+    prefix_conditioner = model.prefix_conditioner
+    return prefix_conditioner.norm(prefix_conditioner.project(conditioner(value)))
+
+def _static_conditioning_segments(character_id: str, language: str, speaking_rate: float,
+                                  pitch_std: float, emotion: Optional[str]) -> tuple:
+    """
+    텍스트와 무관한 conditioning 구간을 (cond, uncond) 행별로 미리 계산
+    
+    PrefixConditioner의 project/LayerNorm은 토큰별 연산이라 conditioner별로 나눠
+    계산해도 결과가 같으므로, 캐릭터/언어/속도/피치/감정 구간은 한 번만 계산하고
+    espeak(텍스트) 자리만 None으로 비워 둡니다.
+    """
+    cache_key = (character_id, language, speaking_rate, pitch_std, emotion)
+    cached = _character_cache_get(_conditioning_cache, cache_key)
+    if cached is not None:
+        return cached
+    
+    speaker_embedding = load_character_embedding(character_id)
+    cond_dict = build_cond_dict([""], speaker_embedding, language, speaking_rate, pitch_std, emotion)
+    prefix_conditioner = model.prefix_conditioner
+    uncond_dict = {k: cond_dict[k] for k in prefix_conditioner.required_keys}
     
     with torch.no_grad():
+        segments = tuple(
+            tuple(
+                None if conditioner.name == "espeak" and "espeak" in row
+                else _conditioning_segment(conditioner, row.get(conditioner.name))
+                for conditioner in prefix_conditioner.conditioners
+            )
+            for row in (cond_dict, uncond_dict)
+        )
+    _character_cache_put(_conditioning_cache, cache_key, segments, CONDITIONING_CACHE_SIZE)
+    return segments
+
+def prepare_tts_conditioning(texts: List[str], speaker_embedding: torch.Tensor, language: str = "ko",
+                             speaking_rate: float = 15.0, pitch_std: float = 30.0,
+                             emotion: Optional[str] = None,
+                             character_id: Optional[str] = None) -> torch.Tensor:
+    """
+    model.prepare_conditioning과 같은 [2 * len(texts), seq, dim] conditioning 생성
+    
+    character_id가 주어지면 텍스트와 무관한 구간은 캐시에서 가져오고
+    espeak(텍스트) 구간만 새로 계산합니다.
+    """
+    if character_id is None:
+        cond_dict = build_cond_dict(texts, speaker_embedding, language, speaking_rate, pitch_std, emotion)
+        return model.prepare_conditioning(cond_dict)
+    
+    static_rows = _static_conditioning_segments(character_id, language, speaking_rate, pitch_std, emotion)
+    espeak_conditioner = next(c for c in model.prefix_conditioner.conditioners if c.name == "espeak")
+    text_segment = _conditioning_segment(espeak_conditioner, (list(texts), [language] * len(texts)))
+    
+    batch_size = len(texts)
+    return torch.cat([
+        torch.cat([
+            text_segment if segment is None else segment.expand(batch_size, -1, -1)
+            for segment in row
+        ], dim=-2)
+        for row in static_rows
+    ])
+
+def generate_tts_audio(text: str, speaker_embedding: torch.Tensor, language: str = "ko", 
+                       speaking_rate: float = 15.0, pitch_std: float = 30.0,
+                       emotion: Optional[str] = None,
+                       character_id: Optional[str] = None) -> torch.Tensor:
+    """TTS 오디오 생성 (character_id를 주면 텍스트 외 conditioning 캐시 사용)"""
+    with torch.no_grad():
+        conditioning = prepare_tts_conditioning(
+            [text], speaker_embedding, language, speaking_rate, pitch_std, emotion, character_id
+        )
         max_tokens = calculate_max_tokens(len(text))
         codes = model.generate(
             conditioning,
             max_new_tokens=max_tokens,
             sampling_params={"min_p": 0.1, "temperature": 1.0}
         )
-        return model.autoencoder.decode(codes).cpu()
+        return copy_audio_to_host(model.autoencoder.decode(codes))
+
+def generate_tts_audio_batch(texts: List[str], speaker_embedding: torch.Tensor, language: str = "ko",
+                             speaking_rate: float = 15.0, pitch_std: float = 30.0,
+                             character_id: Optional[str] = None) -> List[torch.Tensor]:
+    """
+    여러 텍스트의 TTS를 한 번의 model.generate 호출로 배치 생성
+    
+    Args:
+        texts: 생성할 텍스트 리스트 (같은 화자/언어)
+        speaker_embedding: 화자 임베딩
+        character_id: 캐릭터 ID (주면 텍스트 외 conditioning 캐시 사용)
+        
+    Returns:
+        List[torch.Tensor]: 텍스트별 오디오 ([1, 1, samples], generate_tts_audio와 같은 형태)
+    """
+    # 샘플마다 EOS 시점이 달라서, codebook 0에 EOS가 처음 나온 step(= 유효 프레임 수)을 기록
+    eos_steps: List[Optional[int]] = [None] * len(texts)
+    
+    def track_eos(frame: torch.Tensor, step: int, max_steps: int) -> bool:
+        for i, is_eos in enumerate((frame[:, 0, 0] == model.eos_token_id).tolist()):
+            if is_eos and eos_steps[i] is None:
+                eos_steps[i] = step
+        return True
+    
+    with torch.no_grad():
+        conditioning = prepare_tts_conditioning(
+            texts, speaker_embedding, language, speaking_rate, pitch_std, character_id=character_id
+        )
+        max_tokens = max(calculate_max_tokens(len(text)) for text in texts)
+        codes = model.generate(
+            conditioning,
+            max_new_tokens=max_tokens,
+            batch_size=len(texts),
+            sampling_params={"min_p": 0.1, "temperature": 1.0},
+            callback=track_eos
+        )
+        wavs = copy_audio_to_host(model.autoencoder.decode(codes))
+    
+    # EOS 이후(패딩) 구간 잘라내기
+    num_frames = codes.shape[-1]
+    samples_per_frame = wavs.shape[-1] // num_frames
+    return [
+        wavs[i:i + 1, ..., :min(eos_step or num_frames, num_frames) * samples_per_frame]
+        for i, eos_step in enumerate(eos_steps)
+    ]
+
+def list_cached_audio_files(cache_dir: Path) -> set:
+    """캐시 디렉토리의 파일 이름 집합 (페이지마다 stat 대신 디렉토리를 한 번만 읽음)"""
+    try:
+        with os.scandir(cache_dir) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
 
 def check_mongodb_available():
     """MongoDB 연결 확인"""
@@ -430,24 +759,95 @@ def storybookdb_to_storyinfo(story_db: "StorybookDB") -> StoryInfo:
 
 # ==================== 시작/종료 이벤트 ====================
 
+def setup_queue_logging() -> QueueListener:
+    """
+    logger의 출력을 큐로 넘기고 QueueListener 스레드에서 stdout에 기록
+    
+    이벤트 루프/TTS 스레드는 큐에 넣기만 하므로 stdout 쓰기를 기다리지 않습니다.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+def load_zonos_model() -> Zonos:
+    """Zonos 모델 로드 (startup에서 스레드로 실행)"""
+    # Transformer 모델 (더 빠름)
+    zonos_model = Zonos.from_pretrained("Zyphra/Zonos-v0.1-transformer", device=device)
+    # Hybrid 모델 (더 고품질)
+    # zonos_model = Zonos.from_pretrained("Zyphra/Zonos-v0.1-hybrid", device=device)
+    # from_pretrained가 backbone을 BF16으로 로드하므로 추론 전용으로만 고정
+    # (DAC 디코더는 autoencoder.decode 내부에서 FP16 autocast 사용)
+    zonos_model.requires_grad_(False).eval()
+    return zonos_model
+
+async def ensure_audio_cache_index(repo: "AudioCacheRepository"):
+    """audio_cache 컬렉션에 unique index 생성 (중복 저장 방지)"""
+    try:
+        await repo.collection.create_index(
+            [("character_id", 1), ("story_id", 1), ("chunk_index", 1)],
+            unique=True,
+            name="unique_audio_cache"
+        )
+        print("✅ Unique index created on audio_cache (character_id, story_id, chunk_index)")
+    except Exception as idx_error:
+        # 이미 인덱스가 있으면 무시
+        if "already exists" in str(idx_error) or "E11000" in str(idx_error):
+            print("✅ Unique index already exists on audio_cache")
+        else:
+            print(f"⚠️ Failed to create unique index: {idx_error}")
+
+async def ensure_characters_index(repo: "CharacterRepository"):
+    """characters 컬렉션에 character_id unique index 생성 (get_by_id 조회용, 중복 방지)"""
+    try:
+        await repo.collection.create_index(
+            "character_id",
+            unique=True,
+            name="unique_character_id"
+        )
+        print("✅ Unique index ready on characters (character_id)")
+    except Exception as idx_error:
+        print(f"⚠️ Failed to create characters index: {idx_error}")
+
+async def ensure_llm_cache_index(repo: "LLMCacheRepository"):
+    """LLM 응답 캐시 TTL 인덱스 생성"""
+    try:
+        await repo.create_ttl_index(LLM_CACHE_TTL)
+        print(f"✅ TTL index ready on llm_cache ({LLM_CACHE_TTL}s)")
+    except Exception as idx_error:
+        print(f"⚠️ Failed to create llm_cache TTL index: {idx_error}")
+
+async def ensure_llm_sessions_index(repo: "LLMSessionRepository"):
+    """세션별 Assistant thread 매핑 만료 시각 TTL 인덱스 생성"""
+    try:
+        await repo.create_ttl_index()
+        print("✅ TTL index ready on llm_sessions (expires_at)")
+    except Exception as idx_error:
+        print(f"⚠️ Failed to create llm_sessions TTL index: {idx_error}")
+
 @app.on_event("startup")
 async def startup_event():
     """서버 시작시 모델 로드"""
-    global model, character_repo, storybook_repo, audio_cache_repo
+    global model, character_repo, storybook_repo, audio_cache_repo, llm_cache_repo, llm_session_repo, redis_client, tts_worker_task, log_listener, IO_POOL
+    # startup이 다시 불려도(테스트 클라이언트 재사용 등) 로깅 리스너 스레드는 하나만 유지
+    if log_listener is None:
+        log_listener = setup_queue_logging()
+    if IO_POOL is None:
+        IO_POOL = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="tts-io")
     print("=" * 60)
     print("🚀 Zonos Multi-Character TTS API Server Starting...")
     print("=" * 60)
     
+    # 모델 로드는 오래 걸리므로 스레드에서 진행하고, 그동안 캐릭터 DB/MongoDB/Redis 준비
     print("\n📦 Loading Zonos model...")
-    try:
-        # Transformer 모델 (더 빠름)
-        model = Zonos.from_pretrained("Zyphra/Zonos-v0.1-transformer", device=device)
-        # Hybrid 모델 (더 고품질)
-        # model = Zonos.from_pretrained("Zyphra/Zonos-v0.1-hybrid", device=device)
-        print(f"✅ Model loaded successfully on {device}")
-    except Exception as e:
-        print(f"❌ Failed to load model: {e}")
-        raise
+    model_task = asyncio.create_task(asyncio.to_thread(load_zonos_model))
     
     print("\n📚 Loading characters database...")
     load_characters_db()
@@ -465,21 +865,21 @@ async def startup_event():
                 character_repo = CharacterRepository(db)
                 storybook_repo = StorybookRepository(db)
                 audio_cache_repo = AudioCacheRepository(db)
+                llm_cache_repo = LLMCacheRepository(db)
+                llm_session_repo = LLMSessionRepository(db)
                 
-                # audio_cache 컬렉션에 unique index 생성 (중복 저장 방지)
-                try:
-                    await audio_cache_repo.collection.create_index(
-                        [("character_id", 1), ("story_id", 1), ("chunk_index", 1)],
-                        unique=True,
-                        name="unique_audio_cache"
-                    )
-                    print("✅ Unique index created on audio_cache (character_id, story_id, chunk_index)")
-                except Exception as idx_error:
-                    # 이미 인덱스가 있으면 무시
-                    if "already exists" in str(idx_error) or "E11000" in str(idx_error):
-                        print("✅ Unique index already exists on audio_cache")
-                    else:
-                        print(f"⚠️ Failed to create unique index: {idx_error}")
+                # 서로 독립적인 인덱스 생성은 동시에 실행
+                await asyncio.gather(
+                    ensure_audio_cache_index(audio_cache_repo),
+                    ensure_characters_index(character_repo),
+                    ensure_llm_cache_index(llm_cache_repo),
+                    ensure_llm_sessions_index(llm_session_repo),
+                )
+                
+                # LLM 응답 캐시 / 세션 thread 매핑을 LLMService의 영구 저장소로 연결
+                if llm_service is not None:
+                    llm_service.response_store = llm_cache_repo
+                    llm_service.thread_store = llm_session_repo
                 
                 print("✅ Repositories initialized")
         except Exception as e:
@@ -488,11 +888,41 @@ async def startup_event():
             character_repo = None
             storybook_repo = None
             audio_cache_repo = None
+            llm_cache_repo = None
+            llm_session_repo = None
     else:
         print("\n⚠️ MongoDB not available")
         character_repo = None
         storybook_repo = None
         audio_cache_repo = None
+        llm_cache_repo = None
+        llm_session_repo = None
+    
+    # Redis 작업 큐 연결 및 워커 시작
+    if REDIS_AVAILABLE and REDIS_URL:
+        try:
+            print("\n📮 Connecting to Redis...")
+            redis_client = aioredis.from_url(REDIS_URL)
+            await redis_client.ping()
+            print("✅ Redis connected")
+        except Exception as e:
+            print(f"⚠️ Redis connection failed: {e}")
+            print("⚠️ TTS task queue will be disabled")
+            redis_client = None
+    else:
+        print("\n⚠️ Redis not configured (REDIS_URL), TTS task queue disabled")
+    
+    try:
+        model = await model_task
+        print(f"✅ Model loaded successfully on {device} ({next(model.parameters()).dtype})")
+    except Exception as e:
+        print(f"❌ Failed to load model: {e}")
+        raise
+    
+    # 워커는 모델이 준비된 뒤에 시작
+    if redis_client is not None:
+        tts_worker_task = asyncio.create_task(tts_worker_loop())
+        print("✅ TTS worker started")
     
     print("\n" + "=" * 60)
     print("✨ Server is ready!")
@@ -501,12 +931,36 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """서버 종료시 MongoDB 연결 종료"""
+    """서버 종료시 TTS 워커 중지, 캐릭터 DB 저장 및 MongoDB/Redis 연결 종료"""
+    global log_listener, IO_POOL
+    if tts_worker_task is not None:
+        tts_worker_task.cancel()
+        try:
+            await tts_worker_task
+        except asyncio.CancelledError:
+            pass
+    
+    if redis_client is not None:
+        try:
+            await redis_client.aclose()
+        except Exception as e:
+            print(f"⚠️ Error closing Redis connection: {e}")
+    
+    await flush_characters_db()
+    if IO_POOL is not None:
+        # 남은 쓰기가 끝날 때까지 기다리되 이벤트 루프는 막지 않음 (다음 startup에서 새로 만듦)
+        io_pool, IO_POOL = IO_POOL, None
+        await asyncio.to_thread(io_pool.shutdown)
+    
     if MONGODB_AVAILABLE:
         try:
             await close_mongo_connection()
         except Exception as e:
             print(f"⚠️ Error closing MongoDB connection: {e}")
+    
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
 
 # ==================== API 엔드포인트 ====================
 
@@ -528,7 +982,6 @@ async def list_characters():
     Returns:
         List[CharacterInfo]: 캐릭터 정보 리스트
     """
-    load_characters_db()
     return [CharacterInfo(**char) for char in characters_db.values()]
 
 @app.get("/characters/{character_id}", response_model=CharacterInfo)
@@ -572,39 +1025,55 @@ async def create_character(
     temp_audio_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await reference_audio.read()
-            temp_file.write(content)
+            # 업로드 전체를 bytes로 올리지 않고 청크 단위로 디스크에 기록
+            while chunk := await reference_audio.read(UPLOAD_CHUNK_SIZE):
+                temp_file.write(chunk)
             temp_audio_path = temp_file.name
         
         # 3. 오디오 로드
         print(f"📝 Creating character '{name}' (ID: {character_id})")
-        wav, sampling_rate = torchaudio.load(temp_audio_path)
+        wav, sampling_rate = await load_audio_file_async(temp_audio_path)
         
         # 4. Speaker Embedding 생성
         print("🎤 Extracting speaker embedding...")
         speaker_embedding = model.make_speaker_embedding(wav, sampling_rate)
         
         # 5. Embedding 저장
-        embedding_path = get_embedding_path(character_id)
-        torch.save(speaker_embedding, embedding_path)
+        embedding_path = save_character_embedding(character_id, speaker_embedding)
         print(f"💾 Saved embedding: {embedding_path}")
         
         # 6. 참조 오디오 저장
         ref_audio_path = REFERENCE_DIR / f"{character_id}.wav"
-        save_audio_file(wav, sampling_rate, ref_audio_path)
+        await save_audio_file_async(wav, sampling_rate, ref_audio_path)
         
         # 7. 캐릭터 정보 저장
+        created_at = datetime.now()
         character_info = {
             "id": character_id,
             "name": name,
             "description": description,
             "language": language,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at.isoformat(),
             "reference_audio": str(ref_audio_path.relative_to(BASE_DIR))
         }
         
         characters_db[character_id] = character_info
-        save_characters_db()
+        schedule_save_characters_db()
+        
+        # 8. MongoDB가 있으면 캐릭터 문서와 참조 오디오(GridFS, 청크 단위 업로드)도 저장
+        # 실패해도 로컬 캐릭터는 이미 만들어졌으므로 경고만 출력
+        if character_repo is not None:
+            try:
+                await character_repo.save_character(CharacterDB(
+                    character_id=character_id,
+                    name=name,
+                    description=description,
+                    language=language,
+                    created_at=created_at
+                ))
+                await character_repo.save_reference_audio(character_id, ref_audio_path)
+            except Exception as e:
+                print(f"⚠️ MongoDB 캐릭터 저장 실패: {e}")
         
         print(f"✅ Character '{name}' created successfully!")
         return CharacterInfo(**character_info)
@@ -628,19 +1097,22 @@ async def delete_character(character_id: str):
     if character_id not in characters_db:
         raise HTTPException(status_code=404, detail="Character not found")
     
-    # 임베딩 파일 삭제
-    embedding_path = get_embedding_path(character_id)
-    if embedding_path.exists():
-        embedding_path.unlink()
+    # 임베딩 파일 삭제 (safetensors + 구버전 .pt)
+    for embedding_path in (get_embedding_path(character_id), get_legacy_embedding_path(character_id)):
+        if embedding_path.exists():
+            embedding_path.unlink()
     
     # 참조 오디오 삭제 (선택적)
     ref_audio_path = REFERENCE_DIR / f"{character_id}.wav"
     if ref_audio_path.exists():
         ref_audio_path.unlink()
     
+    # 삭제된 캐릭터의 임베딩/conditioning 캐시만 제거
+    evict_character_caches(character_id)
+    
     # DB에서 삭제
     del characters_db[character_id]
-    save_characters_db()
+    schedule_save_characters_db()
     
     return {"message": f"Character '{character_id}' deleted successfully"}
 
@@ -661,25 +1133,29 @@ async def generate_tts(request: TTSRequest):
             raise HTTPException(status_code=404, detail="Character not found")
         
         # 2. Speaker Embedding 로드
-        speaker_embedding = load_character_embedding(request.character_id)
+        speaker_embedding = await load_character_embedding_async(request.character_id)
         
         # 3. TTS 생성
         speaking_rate = request.speaking_rate if request.speaking_rate > 1.0 else 15.0
         print(f"🎤 Generating TTS for character '{request.character_id}'...")
-        wavs = generate_tts_audio(
-            text=request.text,
-            speaker_embedding=speaker_embedding,
-            language=request.language,
-            speaking_rate=speaking_rate,
-            emotion=request.emotion
-        )
+        async with tts_semaphore:
+            # GPU 추론은 스레드에서 실행해 이벤트 루프를 막지 않음
+            wavs = await asyncio.to_thread(
+                generate_tts_audio,
+                text=request.text,
+                speaker_embedding=speaker_embedding,
+                language=request.language,
+                speaking_rate=speaking_rate,
+                emotion=request.emotion,
+                character_id=request.character_id
+            )
         
         # 4. 파일 저장
         character_name = characters_db[request.character_id]["name"]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{character_name}_{timestamp}.wav"
         output_path = OUTPUTS_DIR / filename
-        save_audio_file(wavs, model.autoencoder.sampling_rate, output_path)
+        await save_audio_file_async(wavs, model.autoencoder.sampling_rate, output_path)
         
         print(f"✅ TTS generated: {output_path}")
         return FileResponse(
@@ -714,29 +1190,38 @@ async def batch_generate_tts(
     if character_id not in characters_db:
         raise HTTPException(status_code=404, detail="Character not found")
     
-    speaker_embedding = load_character_embedding(character_id)
+    speaker_embedding = await load_character_embedding_async(character_id)
     generated_files = []
+    sampling_rate = model.autoencoder.sampling_rate
     
-    for idx, text in enumerate(texts):
+    # TTS_MAX_BATCH_SIZE개씩 묶어 한 번의 model.generate로 생성
+    for start in range(0, len(texts), TTS_MAX_BATCH_SIZE):
+        batch = texts[start:start + TTS_MAX_BATCH_SIZE]
         try:
-            wavs = generate_tts_audio(text, speaker_embedding, language)
-            filename = f"{character_id}_batch_{idx}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-            output_path = OUTPUTS_DIR / filename
-            save_audio_file(wavs, model.autoencoder.sampling_rate, output_path)
-            
-            generated_files.append({
-                "index": idx,
-                "text": text,
-                "file": str(output_path.relative_to(BASE_DIR))
-            })
+            async with tts_semaphore:
+                batch_wavs = await asyncio.to_thread(
+                    generate_tts_audio_batch, batch, speaker_embedding, language, character_id=character_id
+                )
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            for idx, (text, wavs) in enumerate(zip(batch, batch_wavs), start=start):
+                filename = f"{character_id}_batch_{idx}_{timestamp}.wav"
+                output_path = OUTPUTS_DIR / filename
+                await save_audio_file_async(wavs, sampling_rate, output_path)
+                
+                generated_files.append({
+                    "index": idx,
+                    "text": text,
+                    "file": str(output_path.relative_to(BASE_DIR))
+                })
             
         except Exception as e:
-            print(f"Error generating batch item {idx}: {e}")
-            generated_files.append({
-                "index": idx,
-                "text": text,
-                "error": str(e)
-            })
+            print(f"Error generating batch items {start}-{start + len(batch) - 1}: {e}")
+            done = {item["index"] for item in generated_files}
+            generated_files.extend(
+                {"index": idx, "text": text, "error": str(e)}
+                for idx, text in enumerate(batch, start=start)
+                if idx not in done
+            )
     
     return {"results": generated_files}
 
@@ -774,69 +1259,151 @@ async def pregenerate_story_audio(request: PreGenerateStoryRequest):
     Returns:
         생성된 오디오 파일 경로 맵핑
     """
-    character_id = request.character_id
-    story_id = request.story_id or "default"  # story_id가 없으면 "default" 사용
+    # story_id가 없으면 "default" 사용
+    return await run_story_pregeneration(request.character_id, request.story_id or "default", request.pages)
+
+def claim_inflight_pages(story_id: str, character_id: str, page_nums: List[int]) -> Dict[int, asyncio.Event]:
+    """
+    다른 요청이 생성 중이지 않은 페이지만 _inflight_pages에 등록 (배치 생성용)
     
+    Returns:
+        이번 요청이 맡은 {page_num: Event} (release_inflight_pages로 반드시 해제)
+    """
+    claimed: Dict[int, asyncio.Event] = {}
+    for page_num in page_nums:
+        inflight_key = (character_id, story_id, page_num)
+        if page_num not in claimed and inflight_key not in _inflight_pages:
+            claimed[page_num] = _inflight_pages[inflight_key] = asyncio.Event()
+    return claimed
+
+def release_inflight_pages(story_id: str, character_id: str, claimed: Dict[int, asyncio.Event], page_nums: List[int]):
+    """claim_inflight_pages로 맡은 페이지 중 page_nums를 해제하고 기다리는 요청을 깨움 (중복 해제 무시)"""
+    for page_num in page_nums:
+        done = claimed.pop(page_num, None)
+        if done is not None:
+            done.set()
+            del _inflight_pages[(character_id, story_id, page_num)]
+
+async def run_story_pregeneration(character_id: str, story_id: str, pages: List[Dict]) -> Dict:
+    """
+    페이지 리스트의 TTS를 생성하여 로컬 파일에 캐싱 (HTTP 핸들러/Redis 워커 공용)
+    
+    Args:
+        character_id: 캐릭터 ID
+        story_id: 스토리 ID
+        pages: [{page: 1, text: "..."}, ...]
+        
+    Returns:
+        생성된 오디오 파일 경로 맵핑
+    """
     # 캐릭터 확인
     if character_id not in characters_db:
         raise HTTPException(status_code=404, detail="Character not found")
     
     # Speaker Embedding 로드
-    speaker_embedding = load_character_embedding(character_id)
+    speaker_embedding = await load_character_embedding_async(character_id)
     
     # 캐시 디렉토리 생성
     cache_dir = OUTPUTS_DIR / "cache" / story_id / character_id
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    generated_pages = []
-    
     print(f"📚 Pre-generating story audio for character '{character_id}', story '{story_id}'...")
     
-    for page_data in request.pages:
+    # 요청 순서대로 결과를 채우기 위해 인덱스 기준으로 저장
+    generated_pages: List[Optional[Dict]] = [None] * len(pages)
+    pending_pages = []  # [(index, page_data), ...] 캐시되지 않은 페이지
+    existing_files = await asyncio.to_thread(list_cached_audio_files, cache_dir)
+    
+    for idx, page_data in enumerate(pages):
         page_num = page_data["page"]
-        text = page_data["text"]
+        filename = f"page_{page_num}.wav"
         
-        try:
-            # 로컬 파일로 캐시 확인
-            filename = f"page_{page_num}.wav"
-            file_path = cache_dir / filename
+        # 로컬 파일로 캐시 확인
+        if filename in existing_files:
+            logger.info(f"✅ Page {page_num} already cached: {cache_dir / filename}")
+            generated_pages[idx] = {
+                "page": page_num,
+                "text": page_data["text"],
+                "audio_url": f"/outputs/cache/{story_id}/{character_id}/{filename}"
+            }
+        else:
+            pending_pages.append((idx, page_data))
+    
+    # 다른 요청(lazy/stream 엔드포인트 등)이 생성 중인 페이지는 배치에서 빼고 그 결과를 기다림
+    claimed = claim_inflight_pages(story_id, character_id, [page_data["page"] for _, page_data in pending_pages])
+    waiting_pages = [(idx, page_data) for idx, page_data in pending_pages if page_data["page"] not in claimed]
+    pending_pages = [(idx, page_data) for idx, page_data in pending_pages if page_data["page"] in claimed]
+    
+    # 캐시되지 않은 페이지를 TTS_MAX_BATCH_SIZE개씩 묶어 한 번에 생성
+    try:
+        for start in range(0, len(pending_pages), TTS_MAX_BATCH_SIZE):
+            batch = pending_pages[start:start + TTS_MAX_BATCH_SIZE]
+            page_nums = [page_data["page"] for _, page_data in batch]
             
-            if file_path.exists():
-                print(f"✅ Page {page_num} already cached: {file_path}")
-                audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
-            else:
-                # TTS 생성
-                print(f"🎤 Generating page {page_num}...")
+            try:
+                logger.info(f"🎤 Generating pages {page_nums} in one batch...")
+                async with tts_semaphore:
+                    batch_wavs = await asyncio.to_thread(
+                        generate_tts_audio_batch,
+                        [page_data["text"] for _, page_data in batch],
+                        speaker_embedding,
+                        language="ko",
+                        character_id=character_id
+                    )
+                sampling_rate = model.autoencoder.sampling_rate
                 
-                # Race condition 방지: 저장 전에 다시 한 번 확인
-                if file_path.exists():
-                    print(f"✅ Page {page_num} was cached by another request, using existing")
-                    audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
-                else:
-                    wavs = generate_tts_audio(text, speaker_embedding, language="ko")
-                    sampling_rate = model.autoencoder.sampling_rate
+                for (idx, page_data), wavs in zip(batch, batch_wavs):
+                    page_num = page_data["page"]
+                    filename = f"page_{page_num}.wav"
+                    file_path = cache_dir / filename
                     
-                    # 로컬 파일로 저장
-                    save_audio_file(wavs, sampling_rate, file_path)
-                    print(f"✅ Page {page_num} audio saved to: {file_path}")
+                    # Race condition 방지: 저장 전에 다시 한 번 확인
+                    if file_path.exists():
+                        logger.info(f"✅ Page {page_num} was cached by another request, using existing")
+                    else:
+                        # 로컬 파일로 저장
+                        await save_audio_file_async(wavs, sampling_rate, file_path)
+                        logger.info(f"✅ Page {page_num} audio saved to: {file_path}")
                     
-                    audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
+                    generated_pages[idx] = {
+                        "page": page_num,
+                        "text": page_data["text"],
+                        "audio_url": f"/outputs/cache/{story_id}/{character_id}/{filename}"
+                    }
             
-            generated_pages.append({
+            except Exception as e:
+                logger.exception(f"❌ Error generating pages {page_nums}: {e}")
+                for idx, page_data in batch:
+                    if generated_pages[idx] is None:
+                        generated_pages[idx] = {
+                            "page": page_data["page"],
+                            "text": page_data["text"],
+                            "error": str(e)
+                        }
+            finally:
+                release_inflight_pages(story_id, character_id, claimed, page_nums)
+    finally:
+        release_inflight_pages(story_id, character_id, claimed, list(claimed))
+    
+    for idx, page_data in waiting_pages:
+        page_num = page_data["page"]
+        filename = f"page_{page_num}.wav"
+        inflight = _inflight_pages.get((character_id, story_id, page_num))
+        if inflight is not None:
+            await inflight.wait()
+        if (cache_dir / filename).exists():
+            logger.info(f"✅ Page {page_num} was generated by another request, using existing")
+            generated_pages[idx] = {
                 "page": page_num,
-                "text": text,
-                "audio_url": audio_url
-            })
-            
-        except Exception as e:
-            print(f"❌ Error generating page {page_num}: {e}")
-            import traceback
-            traceback.print_exc()
-            generated_pages.append({
+                "text": page_data["text"],
+                "audio_url": f"/outputs/cache/{story_id}/{character_id}/{filename}"
+            }
+        else:
+            generated_pages[idx] = {
                 "page": page_num,
-                "text": text,
-                "error": str(e)
-            })
+                "text": page_data["text"],
+                "error": f"Concurrent generation of page {page_num} failed"
+            }
     
     return {
         "character_id": character_id,
@@ -845,6 +1412,94 @@ async def pregenerate_story_audio(request: PreGenerateStoryRequest):
         "pages": generated_pages
     }
 
+# ==================== TTS 작업 큐 (Redis) ====================
+
+def get_task_result_key(task_id: str) -> str:
+    """작업 상태/결과 Redis 키"""
+    return f"task:result:{task_id}"
+
+async def set_task_status(task_id: str, status: Dict):
+    """작업 상태/결과 저장 (TTS_TASK_RESULT_TTL 후 만료)"""
+    await redis_client.set(get_task_result_key(task_id), orjson.dumps(status), ex=TTS_TASK_RESULT_TTL)
+
+async def tts_worker_loop():
+    """Redis 큐에서 동화 TTS 작업을 하나씩 꺼내 처리하는 백그라운드 워커"""
+    while True:
+        try:
+            # rpush로 넣고 blpop으로 꺼내므로 FIFO 순서로 처리
+            _, payload = await redis_client.blpop(TTS_QUEUE_KEY)
+            task = orjson.loads(payload)
+            task_id = task["task_id"]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ TTS worker failed to fetch task: {e}")
+            await asyncio.sleep(1)
+            continue
+        
+        print(f"👷 Processing TTS task {task_id}...")
+        try:
+            await set_task_status(task_id, {"status": "processing"})
+            result = await run_story_pregeneration(task["character_id"], task["story_id"], task["pages"])
+            await set_task_status(task_id, {"status": "completed", "result": result})
+            print(f"✅ TTS task {task_id} completed")
+        except asyncio.CancelledError:
+            raise
+        except HTTPException as e:
+            await set_task_status(task_id, {"status": "failed", "error": e.detail})
+        except Exception as e:
+            print(f"❌ TTS task {task_id} failed: {e}")
+            await set_task_status(task_id, {"status": "failed", "error": str(e)})
+
+@app.post("/stories/pregenerate/async")
+async def enqueue_story_audio(request: PreGenerateStoryRequest):
+    """
+    동화책 TTS 미리 생성을 Redis 큐에 등록하고 바로 작업 ID 반환
+    
+    Args:
+        request: character_id, story_id(선택), pages 리스트
+        
+    Returns:
+        task_id: /tts/status/{task_id}로 진행 상태 및 결과 조회
+    """
+    if redis_client is None:
+        raise HTTPException(status_code=503, detail="Redis not available")
+    
+    if request.character_id not in characters_db:
+        raise HTTPException(status_code=404, detail="Character not found")
+    
+    task_id = uuid.uuid4().hex
+    task = {
+        "task_id": task_id,
+        "character_id": request.character_id,
+        "story_id": request.story_id or "default",
+        "pages": request.pages
+    }
+    await set_task_status(task_id, {"status": "queued"})
+    await redis_client.rpush(TTS_QUEUE_KEY, orjson.dumps(task))
+    
+    return {"task_id": task_id, "status": "queued"}
+
+@app.get("/tts/status/{task_id}")
+async def get_tts_task_status(task_id: str):
+    """
+    TTS 작업 상태 조회
+    
+    Args:
+        task_id: 작업 ID
+        
+    Returns:
+        status (queued/processing/completed/failed) 및 완료 시 result
+    """
+    if redis_client is None:
+        raise HTTPException(status_code=503, detail="Redis not available")
+    
+    data = await redis_client.get(get_task_result_key(task_id))
+    if data is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    return {"task_id": task_id, **orjson.loads(data)}
+
 @app.get("/cache/gridfs/{file_id}")
 async def get_cached_audio_from_gridfs(file_id: str):
     """
@@ -858,24 +1513,31 @@ async def get_cached_audio_from_gridfs(file_id: str):
     
     try:
         print(f"🔍 Loading audio from GridFS: {file_id}")
-        audio_bytes = await audio_cache_repo.load_audio_from_gridfs(file_id)
+        grid_out = await audio_cache_repo.open_audio_stream(file_id)
         
-        if not audio_bytes or len(audio_bytes) == 0:
+        if grid_out.length == 0:
             print(f"❌ Audio file is empty: {file_id}")
             raise HTTPException(status_code=404, detail="Audio file is empty")
         
-        print(f"✅ Audio loaded successfully: {len(audio_bytes)} bytes")
+        async def iter_audio_chunks():
+            # 전체 파일을 메모리에 올리지 않고 GridFS 청크(기본 255KB) 단위로 전송
+            while chunk := await grid_out.readchunk():
+                yield chunk
+        
+        print(f"✅ Streaming audio: {grid_out.length} bytes")
         return StreamingResponse(
-            io.BytesIO(audio_bytes),
+            iter_audio_chunks(),
             media_type="audio/wav",
             headers={
                 "Content-Type": "audio/wav",
-                "Content-Length": str(len(audio_bytes)),
+                "Content-Length": str(grid_out.length),
                 "Accept-Ranges": "bytes",
                 # Content-Disposition을 inline으로 변경 (다운로드 대신 재생)
                 "Content-Disposition": f'inline; filename="audio_{file_id}.wav"'
             }
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         print(f"❌ Invalid file_id format: {file_id}, error: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid file_id format: {str(e)}")
@@ -902,19 +1564,50 @@ async def generate_tts_for_llm(text: str, character_id: str) -> str:
         raise HTTPException(status_code=404, detail="Character not found")
     
     # Speaker Embedding 로드 및 TTS 생성
-    speaker_embedding = load_character_embedding(character_id)
-    wavs = generate_tts_audio(text, speaker_embedding, language="ko")
+    speaker_embedding = await load_character_embedding_async(character_id)
+    async with tts_semaphore:
+        wavs = await asyncio.to_thread(
+            generate_tts_audio, text, speaker_embedding, language="ko", character_id=character_id
+        )
     
     # 파일 저장
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"llm_{character_id}_{timestamp}.wav"
+    # 문장별 TTS가 같은 초에 여러 개 생길 수 있으므로 고유 접미사 추가
+    filename = f"llm_{character_id}_{timestamp}_{uuid.uuid4().hex[:8]}.wav"
     output_path = OUTPUTS_DIR / filename
-    save_audio_file(wavs, model.autoencoder.sampling_rate, output_path)
+    await save_audio_file_async(wavs, model.autoencoder.sampling_rate, output_path)
     
     audio_url = f"/outputs/{filename}"
     print(f"✅ LLM + TTS generated: {output_path}")
     return audio_url
 
+def concat_audio_files(paths: List[Path], output_path: Path):
+    """같은 샘플레이트의 WAV 파일들을 순서대로 이어 하나의 파일로 저장"""
+    parts = []
+    sampling_rate = None
+    for path in paths:
+        audio, sampling_rate = load_audio_file(str(path))
+        parts.append(audio)
+    sf.write(str(output_path), torch.cat(parts, dim=1).T.numpy(), sampling_rate)
+
+async def combine_llm_audio(audio_urls: List[str], character_id: str) -> str:
+    """
+    문장별 LLM TTS 파일을 하나로 이어 응답 전체 오디오 생성
+    
+    Args:
+        audio_urls: generate_tts_for_llm이 반환한 문장별 URL (재생 순서)
+        character_id: 캐릭터 ID
+        
+    Returns:
+        audio_url: 합쳐진 오디오 파일 URL
+    """
+    paths = [OUTPUTS_DIR / Path(url).name for url in audio_urls]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"llm_{character_id}_{timestamp}_{uuid.uuid4().hex[:8]}.wav"
+    output_path = OUTPUTS_DIR / filename
+    await asyncio.get_running_loop().run_in_executor(IO_POOL, concat_audio_files, paths, output_path)
+    return f"/outputs/{filename}"
+
 @app.post("/llm/chat", response_model=LLMChatResponse)
 async def chat_with_llm(request: LLMChatRequest):
     """
@@ -944,10 +1637,13 @@ async def chat_with_llm(request: LLMChatRequest):
             system_prompt=request.system_prompt,
             return_audio=request.return_audio,
             tts_callback=tts_callback if request.return_audio and request.character_id else None,
-            current_page_text=request.current_page_text
+            tts_prefetch_callback=load_character_embedding_async,
+            tts_combine_callback=combine_llm_audio,
+            current_page_text=request.current_page_text,
+            session_id=request.session_id
         )
         
-        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"))
+        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"), audio_urls=result.get("audio_urls", []))
         
     except HTTPException:
         raise
@@ -955,6 +1651,23 @@ async def chat_with_llm(request: LLMChatRequest):
         print(f"❌ Error in LLM chat: {e}")
         raise HTTPException(status_code=500, detail=f"LLM 처리 중 오류: {str(e)}")
 
+@app.delete("/llm/sessions/{session_id}")
+async def reset_llm_session(session_id: str):
+    """
+    대화 세션 초기화 (다음 채팅부터 새 Assistant thread 사용)
+    
+    Args:
+        session_id: 대화 세션 ID
+    """
+    if not LLM_AVAILABLE or llm_service is None:
+        raise HTTPException(
+            status_code=500,
+            detail="LLM 서비스가 사용 불가능합니다."
+        )
+    
+    await llm_service.reset_thread(session_id)
+    return {"message": f"Session '{session_id}' reset successfully"}
+
 @app.post("/llm/generate-question", response_model=LLMChatResponse)
 async def generate_question(
     page_text: str = Form(...),
@@ -993,10 +1706,11 @@ async def generate_question(
             story_title=story_title,
             tts_callback=tts_callback,
             full_story_text=full_story_text,
-            page=page  # 페이지 숫자 (string)
+            page=page,  # 페이지 숫자 (string)
+            tts_combine_callback=combine_llm_audio
         )
         
-        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"))
+        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"), audio_urls=result.get("audio_urls", []))
     except Exception as e:
         print(f"❌ Error generating question: {e}")
         raise HTTPException(status_code=500, detail=f"질문 생성 중 오류: {str(e)}")
@@ -1035,10 +1749,11 @@ async def generate_closing_message(
             story_summary=story_summary,
             character_id=character_id,
             character_name=character_name,
-            tts_callback=tts_callback
+            tts_callback=tts_callback,
+            tts_combine_callback=combine_llm_audio
         )
         
-        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"))
+        return LLMChatResponse(text=result["text"], audio_url=result.get("audio_url"), audio_urls=result.get("audio_urls", []))
     except Exception as e:
         print(f"❌ Error generating closing message: {e}")
         raise HTTPException(status_code=500, detail=f"마무리 멘트 생성 중 오류: {str(e)}")
@@ -1103,23 +1818,15 @@ async def list_stories(limit: int = 5):
     check_mongodb_available()
     
     try:
-        # Repository를 사용하여 동화 목록 조회
-        all_stories = await storybook_repo.get_all()
-        
-        # 최대 5개로 제한 (최신순 정렬)
+        # 최대 5개로 제한 (최신순 정렬은 MongoDB에서 _id 기준으로 처리)
         limit = min(limit, 5)
-        # id가 None이 아닌 경우에만 정렬 (ObjectId 문자열은 시간순 정렬 가능)
-        sorted_stories = sorted(
-            [s for s in all_stories if s.id], 
-            key=lambda x: x.id, 
-            reverse=True
-        )[:limit]
+        recent_stories = await storybook_repo.list_recent(limit)
         
         # StorybookDB를 StoryInfo로 변환
-        stories_list = [storybookdb_to_storyinfo(story_db) for story_db in sorted_stories]
+        stories_list = [storybookdb_to_storyinfo(story_db) for story_db in recent_stories]
         
         # 전체 개수
-        total = len(all_stories)
+        total = await storybook_repo.count()
         
         return StoryListResponse(
             stories=stories_list,
@@ -1170,17 +1877,12 @@ async def story_chat(story_id: str, request: LLMChatRequest):
     # 클라이언트에서 오디오 재생 중지는 처리해야 함
     return await chat_with_llm(request)
 
-@app.post("/stories/{story_id}/pregenerate-audio")
-async def pregenerate_story_pages_audio(story_id: str, character_id: str = Form(...)):
+async def prepare_story_page_generation(story_id: str, character_id: str) -> tuple[List[StoryPage], torch.Tensor, Path, set]:
     """
-    동화의 모든 페이지에 대한 오디오를 미리 생성 (로컬 파일 저장)
+    페이지별 오디오 생성 준비 (동화/캐릭터 확인, 임베딩 로드, 캐시 디렉토리 스캔)
     
-    Args:
-        story_id: 동화 ID
-        character_id: 캐릭터 ID
-        
     Returns:
-        생성된 페이지별 오디오 정보
+        (pages, speaker_embedding, cache_dir, existing_files)
     """
     # 동화 및 캐릭터 확인
     if MONGODB_AVAILABLE and storybook_repo:
@@ -1194,55 +1896,121 @@ async def pregenerate_story_pages_audio(story_id: str, character_id: str = Form(
     if character_id not in characters_db:
         raise HTTPException(status_code=404, detail="Character not found")
     
-    speaker_embedding = load_character_embedding(character_id)
+    speaker_embedding = await load_character_embedding_async(character_id)
     
     # 캐시 디렉토리 생성
     cache_dir = OUTPUTS_DIR / "cache" / story_id / character_id
     cache_dir.mkdir(parents=True, exist_ok=True)
     
-    generated_pages = []
+    existing_files = await asyncio.to_thread(list_cached_audio_files, cache_dir)
+    return pages, speaker_embedding, cache_dir, existing_files
+
+async def generate_story_page_audio(story_id: str, character_id: str, page: StoryPage,
+                                    speaker_embedding: torch.Tensor, cache_dir: Path,
+                                    existing_files: set) -> Dict:
+    """페이지 하나의 오디오 생성 (tts_semaphore로 GPU 동시 실행 수 제한)"""
+    filename = f"page_{page.page}.wav"
+    file_path = cache_dir / filename
+    audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
+    
+    try:
+        # 로컬 파일로 캐시 확인
+        if filename in existing_files:
+            logger.info(f"✅ Page {page.page} already cached: {file_path}")
+        elif (inflight_key := (character_id, story_id, page.page)) in _inflight_pages:
+            # 다른 요청이 같은 페이지를 생성 중이면 끝날 때까지 기다렸다가 결과 파일 사용
+            await _inflight_pages[inflight_key].wait()
+            if not file_path.exists():
+                raise RuntimeError(f"Concurrent generation of page {page.page} failed")
+            logger.info(f"✅ Page {page.page} was generated by another request, using existing")
+        else:
+            done = _inflight_pages[inflight_key] = asyncio.Event()
+            try:
+                async with tts_semaphore:
+                    # Race condition 방지: 대기하는 동안 다른 요청이 생성했을 수 있으므로 다시 확인
+                    if file_path.exists():
+                        logger.info(f"✅ Page {page.page} was cached by another request, using existing")
+                    else:
+                        logger.info(f"🎤 Generating audio for page {page.page}...")
+                        # GPU 추론은 스레드에서 실행해 이벤트 루프를 막지 않음
+                        wavs = await asyncio.to_thread(
+                            generate_tts_audio, page.text, speaker_embedding,
+                            language="ko", character_id=character_id
+                        )
+                        
+                        # 로컬 파일로 저장
+                        await save_audio_file_async(wavs, model.autoencoder.sampling_rate, file_path)
+                        logger.info(f"✅ Page {page.page} audio saved to: {file_path}")
+            finally:
+                done.set()
+                del _inflight_pages[inflight_key]
+        
+        return {
+            "page": page.page,
+            "text": page.text,
+            "audio_url": audio_url
+        }
+    except Exception as e:
+        logger.exception(f"❌ Error generating page {page.page}: {e}")
+        return {
+            "page": page.page,
+            "text": page.text,
+            "error": str(e)
+        }
+
+@app.post("/stories/{story_id}/pregenerate-audio")
+async def pregenerate_story_pages_audio(story_id: str, character_id: str = Form(...)):
+    """
+    동화의 모든 페이지에 대한 오디오를 미리 생성 (로컬 파일 저장)
+    
+    Args:
+        story_id: 동화 ID
+        character_id: 캐릭터 ID
+        
+    Returns:
+        생성된 페이지별 오디오 정보
+    """
+    pages, speaker_embedding, cache_dir, existing_files = await prepare_story_page_generation(story_id, character_id)
+    
     print(f"🎤 Pre-generating audio for story '{story_id}' ({len(pages)} pages)...")
     
-    for page in pages:
-        try:
-            # 로컬 파일로 캐시 확인
-            filename = f"page_{page.page}.wav"
-            file_path = cache_dir / filename
-            
-            if file_path.exists():
-                print(f"✅ Page {page.page} already cached: {file_path}")
-                audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
-            else:
-                print(f"🎤 Generating audio for page {page.page}...")
-                
-                # Race condition 방지: 저장 전에 다시 한 번 확인
-                if file_path.exists():
-                    print(f"✅ Page {page.page} was cached by another request, using existing")
-                    audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
-                else:
-                    wavs = generate_tts_audio(page.text, speaker_embedding, language="ko")
-                    sampling_rate = model.autoencoder.sampling_rate
-                    
-                    # 로컬 파일로 저장
-                    save_audio_file(wavs, sampling_rate, file_path)
-                    print(f"✅ Page {page.page} audio saved to: {file_path}")
-                    
-                    audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
-                
-            generated_pages.append({
-                "page": page.page,
-                "text": page.text,
-                "audio_url": audio_url
-            })
-        except Exception as e:
-            print(f"❌ Error generating page {page.page}: {e}")
-            import traceback
-            traceback.print_exc()
-            generated_pages.append({
-                "page": page.page,
-                "text": page.text,
-                "error": str(e)
-            })
+    # 캐시되지 않은 페이지를 TTS_MAX_BATCH_SIZE개씩 묶어 한 번에 생성
+    # (다른 요청이 생성 중인 페이지는 맡지 않고, 아래 페이지별 단계에서 그 결과를 기다림)
+    claimed = claim_inflight_pages(
+        story_id, character_id, [page.page for page in pages if f"page_{page.page}.wav" not in existing_files]
+    )
+    pending_pages = [page for page in pages if page.page in claimed]
+    try:
+        for start in range(0, len(pending_pages), TTS_MAX_BATCH_SIZE):
+            batch = pending_pages[start:start + TTS_MAX_BATCH_SIZE]
+            page_nums = [page.page for page in batch]
+            try:
+                logger.info(f"🎤 Generating pages {page_nums} in one batch...")
+                async with tts_semaphore:
+                    # Race condition 방지: 대기하는 동안 생성된 페이지는 빼고 생성
+                    batch = [page for page in batch if not (cache_dir / f"page_{page.page}.wav").exists()]
+                    batch_wavs = await asyncio.to_thread(
+                        generate_tts_audio_batch, [page.text for page in batch], speaker_embedding,
+                        language="ko", character_id=character_id
+                    ) if batch else []
+                await asyncio.gather(*(
+                    save_audio_file_async(wavs, model.autoencoder.sampling_rate, cache_dir / f"page_{page.page}.wav")
+                    for page, wavs in zip(batch, batch_wavs)
+                ))
+                existing_files.update(f"page_{page_num}.wav" for page_num in page_nums)
+            except Exception as e:
+                # 배치가 실패하면 아래에서 페이지별로 다시 생성
+                logger.warning(f"⚠️ Batch generation failed for pages {page_nums}, falling back to per-page: {e}")
+            finally:
+                release_inflight_pages(story_id, character_id, claimed, page_nums)
+    finally:
+        release_inflight_pages(story_id, character_id, claimed, list(claimed))
+    
+    # 배치에서 빠진 페이지만 페이지별로 생성 (결과는 페이지 순서 유지)
+    generated_pages = await asyncio.gather(*(
+        generate_story_page_audio(story_id, character_id, page, speaker_embedding, cache_dir, existing_files)
+        for page in pages
+    ))
     
     return {
         "story_id": story_id,
@@ -1251,6 +2019,85 @@ async def pregenerate_story_pages_audio(story_id: str, character_id: str = Form(
         "generated_pages": generated_pages
     }
 
+@app.post("/stories/{story_id}/pregenerate-audio/stream")
+async def stream_story_pages_audio(story_id: str, character_id: str = Form(...)):
+    """
+    페이지별 오디오를 생성하면서 완료되는 순서대로 NDJSON으로 전송
+    
+    전체 페이지가 끝날 때까지 기다리지 않고 첫 페이지부터 바로 재생할 수 있습니다.
+    각 줄은 {"page", "text", "audio_url"} 또는 {"page", "text", "error"}이며,
+    완료 순서로 오므로 클라이언트는 page 값으로 정렬해서 사용해야 합니다.
+    
+    Args:
+        story_id: 동화 ID
+        character_id: 캐릭터 ID
+    """
+    pages, speaker_embedding, cache_dir, existing_files = await prepare_story_page_generation(story_id, character_id)
+    
+    print(f"🎤 Streaming audio for story '{story_id}' ({len(pages)} pages)...")
+    
+    async def page_stream():
+        # 연결이 끊겨도 이미 시작된 페이지는 끝까지 생성되어 캐시에 남음
+        tasks = [
+            asyncio.create_task(
+                generate_story_page_audio(story_id, character_id, page, speaker_embedding, cache_dir, existing_files)
+            )
+            for page in pages
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            yield orjson.dumps(await next_done) + b"\n"
+    
+    return StreamingResponse(page_stream(), media_type="application/x-ndjson")
+
+@app.get("/stories/{story_id}/pages/{page_num}/audio")
+async def get_story_page_audio(story_id: str, page_num: int, character_id: str = Query(...)):
+    """
+    페이지 오디오를 필요한 시점에 생성 (lazy)
+    
+    이미 캐시된 페이지는 바로 반환하고, 없으면 그 페이지만 생성합니다.
+    같은 페이지를 동시에 요청해도 생성은 한 번만 일어납니다.
+    
+    Args:
+        story_id: 동화 ID
+        page_num: 페이지 번호
+        character_id: 캐릭터 ID (쿼리 파라미터)
+        
+    Returns:
+        {"page", "text", "audio_url"}
+    """
+    if not MONGODB_AVAILABLE or storybook_repo is None:
+        raise HTTPException(status_code=503, detail="MongoDB not available")
+    
+    story_db = await storybook_repo.get_by_id(story_id)
+    if not story_db:
+        raise HTTPException(status_code=404, detail="Story not found")
+    
+    page = next((p for p in split_story_into_pages(story_db.content) if p.page == page_num), None)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    
+    if character_id not in characters_db:
+        raise HTTPException(status_code=404, detail="Character not found")
+    
+    cache_dir = OUTPUTS_DIR / "cache" / story_id / character_id
+    filename = f"page_{page.page}.wav"
+    
+    # 캐시 히트는 임베딩 로드/Event 생성 없이 바로 반환
+    if (cache_dir / filename).exists():
+        return {
+            "page": page.page,
+            "text": page.text,
+            "audio_url": f"/outputs/cache/{story_id}/{character_id}/{filename}"
+        }
+    
+    speaker_embedding = await load_character_embedding_async(character_id)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    result = await generate_story_page_audio(story_id, character_id, page, speaker_embedding, cache_dir, set())
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
 @app.get("/stories/{story_id}/check-audio")
 async def check_story_audio_files(story_id: str, character_id: str = Query(...)):
     """
@@ -1275,12 +2122,12 @@ async def check_story_audio_files(story_id: str, character_id: str = Query(...))
     
     # 캐시 디렉토리 확인
     cache_dir = OUTPUTS_DIR / "cache" / story_id / character_id
+    existing_files = await asyncio.to_thread(list_cached_audio_files, cache_dir)
     
     for page in pages:
         filename = f"page_{page.page}.wav"
-        file_path = cache_dir / filename
         
-        if file_path.exists():
+        if filename in existing_files:
             audio_url = f"/outputs/cache/{story_id}/{character_id}/{filename}"
             existing_audio.append({
                 "page": page.page,
@@ -3,14 +3,22 @@ LLM 서비스
 OpenAI LLM과의 상호작용 처리
 """
 import os
+import re
+import json
+import asyncio
+import random
+import time
+import hashlib
+import importlib.util
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import timezone
+from functools import lru_cache
 from typing import Optional
 
-# OpenAI LLM 지원
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# OpenAI LLM 지원 (패키지 존재 여부만 확인, 실제 import는 첫 클라이언트 생성 시)
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     print("⚠️ OpenAI 패키지가 설치되지 않았습니다. LLM 기능을 사용하려면 'pip install openai'를 실행하세요.")
 
 class LLMService:
@@ -36,43 +44,302 @@ class LLMService:
         "하츄핑": "asst_t8cx3SsPBjHwIn5ZSlo5GqWq",
     }
     
+    # 소문자 키 -> Assistant ID (import 시 한 번만 만들어 정확히 일치하면 dict 조회로 끝남)
+    _NORM_ASSISTANT_IDS = {key.lower(): assistant_id for key, assistant_id in ASSISTANT_IDS.items()}
+    # 부분 일치 fallback용, 긴 키부터 검사 ("ana"가 "hana"보다 먼저 잡히지 않도록)
+    _SORTED_ASSISTANT_KEYS = sorted(_NORM_ASSISTANT_IDS, key=len, reverse=True)
+    
+    # Assistant Run 상태 폴링 간격 (초) - 지수 백오프 + jitter
+    RUN_POLL_INITIAL_DELAY = 0.1
+    RUN_POLL_MAX_DELAY = 2.0
+    RUN_POLL_BACKOFF = 1.5
+    RUN_POLL_JITTER = 0.3
+    
+    # Chat Completions 폴백 모델 (Assistant가 없거나 실패한 경우)
+    CHAT_MODEL = os.getenv("LLM_CHAT_MODEL", "gpt-4o-mini")
+    
+    # Chat Completions 기본 시스템 프롬프트 (호출마다 바이트 단위로 같아야 프롬프트 prefix 캐시가 적중)
+    DEFAULT_SYSTEM_PROMPT = "당신은 친절한 동화 작가입니다."
+    
+    # 질문 생성 지시문 (고정 부분은 system, 페이지별 내용은 user 메시지로 분리)
+    QUESTION_SYSTEM_PROMPT = """동화 내용을 읽고, 그 페이지의 내용에 맞는 질문을 하나 만들어주세요.
+질문은:
+- 이 페이지에서 나온 내용을 바탕으로 해야 합니다
+- 아이가 이해하기 쉽고 간단해야 합니다
+- 동화의 흐름을 이해하는데 도움이 되어야 합니다
+- 아이의 창의성을 기르는데 도움이 되어야 합니다.
+- 질문만 답변해주세요. 다른 설명은 필요 없습니다.
+- 질문은 반드시 1문장으로만 만들어주세요.
+"""
+    
+    # 마무리 멘트 지시문
+    CLOSING_SYSTEM_PROMPT = """동화를 읽고, 아이에게 동화를 마무리하는 따뜻한 멘트를 해주세요.
+멘트는 1-2문장으로 간단하고 따뜻해야 합니다.
+멘트만 답변해주세요. 다른 설명은 필요 없습니다.
+"""
+    
+    # Chat Completions 폴백 프롬프트에 넣는 현재 페이지 내용 최대 길이 (뒤에서부터 자름)
+    PAGE_CONTEXT_MAX_CHARS = 500
+    
+    # 스트리밍 응답을 문장 단위로 자르는 패턴
+    # ASCII 문장부호는 뒤에 공백이 와야 문장 끝으로 봄 ("3.5" 같은 숫자가 잘리지 않도록),
+    # 전각 문장부호(。！？)는 공백 없이도 문장 끝
+    SENTENCE_PATTERN = re.compile(r".*?(?:[.!?]+\s+|[。！？]+)", re.S)
+    
+    # 세션 thread 매핑 보관 기간 (초, thread_store TTL)
+    SESSION_TTL = int(os.getenv("LLM_SESSION_TTL", str(24 * 60 * 60)))
+    
+    # Batch API 작업 상태 폴링 간격 (초)
+    BATCH_POLL_INTERVAL = 30.0
+    
+    # 질문/마무리 멘트 응답 캐시 크기 (LRU)
+    RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1024"))
+    # 메모리에 유지할 세션 thread 매핑 수 (LRU, 넘치면 thread_store에서 다시 조회)
+    THREAD_CACHE_SIZE = int(os.getenv("LLM_THREAD_CACHE_SIZE", "1024"))
+    # 캐시 항목 형식 버전 (2: audio_url이 첫 문장이 아닌 응답 전체 오디오)
+    RESPONSE_CACHE_VERSION = 2
+    
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
+        # 클라이언트는 처음 사용할 때 한 번만 생성 (HTTP 커넥션 풀 재사용)
+        self._client = None
+        # 구버전 openai (< 1.0.0) 모듈을 클라이언트로 쓰는 경우 True
+        self._legacy_openai = False
+        # (session_id, assistant_id) -> (thread_id, 만료 시각 epoch 초), 같은 세션의 대화는 같은 thread 사용
+        self._threads: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+        # thread에 Run이 동시에 두 개 생기지 않도록 thread 키별 [lock, 사용 중인 요청 수]
+        # (사용하는 요청이 없어지면 삭제되므로 진행 중인 세션 수만큼만 유지)
+        self._thread_locks: dict[tuple[str, str], list] = {}
+        # 프롬프트 해시 -> {"text", "audio_url"} (최근 사용 순)
+        self._response_cache: OrderedDict[str, dict] = OrderedDict()
+        # 재시작 후에도 캐시를 유지할 영구 저장소 (get/set 제공, tts_api에서 MongoDB repo 주입)
+        self.response_store = None
+        # 재시작 후에도 세션 thread를 유지할 저장소 (tts_api에서 MongoDB repo 주입)
+        self.thread_store = None
     
     def _get_openai_client(self):
-        """OpenAI 클라이언트 생성"""
+        """OpenAI 클라이언트 반환 (최초 호출 시 생성 후 재사용)"""
         if not OPENAI_AVAILABLE:
             raise RuntimeError("OpenAI 패키지가 설치되지 않았습니다.")
         
         if not self.api_key:
             raise RuntimeError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
         
+        if self._client is None:
+            import openai
+            try:
+                from openai import AsyncOpenAI
+                self._client = AsyncOpenAI(api_key=self.api_key)
+            except ImportError:
+                # 구버전 openai (< 1.0.0) 대응
+                openai.api_key = self.api_key
+                self._client = openai
+                self._legacy_openai = True
+        return self._client
+    
+    async def _get_thread_id(self, client, assistant_id: str, session_id: Optional[str]) -> str:
+        """세션별 Assistant thread ID 반환 (session_id가 없으면 매번 새 thread)"""
+        if session_id is not None:
+            key = (session_id, assistant_id)
+            cached = self._threads.get(key)
+            if cached is not None:
+                thread_id, expires_at = cached
+                if expires_at > time.time():
+                    self._threads.move_to_end(key)
+                    return thread_id
+                # SESSION_TTL이 지난 thread는 재사용하지 않음
+                del self._threads[key]
+            
+            if self.thread_store is not None:
+                session = None
+                try:
+                    session = await self.thread_store.get_session(session_id, assistant_id)
+                except Exception as e:
+                    print(f"⚠️ 세션 thread 조회 실패: {e}")
+                if session is not None:
+                    # 저장소의 만료 시각을 그대로 따름 (MongoDB는 naive UTC datetime 반환)
+                    expires_at = session.expires_at.replace(tzinfo=timezone.utc).timestamp()
+                    self._remember_thread(key, session.thread_id, expires_at)
+                    return session.thread_id
+        
+        thread = await client.beta.threads.create()
+        if session_id is not None:
+            self._remember_thread((session_id, assistant_id), thread.id, time.time() + self.SESSION_TTL)
+            if self.thread_store is not None:
+                try:
+                    await self.thread_store.set_thread_id(session_id, assistant_id, thread.id, self.SESSION_TTL)
+                except Exception as e:
+                    print(f"⚠️ 세션 thread 저장 실패: {e}")
+        return thread.id
+    
+    def _remember_thread(self, key: tuple[str, str], thread_id: str, expires_at: float):
+        """메모리에 세션 thread 저장 (THREAD_CACHE_SIZE 초과 시 가장 오래 안 쓴 항목 제거)"""
+        self._threads[key] = (thread_id, expires_at)
+        self._threads.move_to_end(key)
+        while len(self._threads) > self.THREAD_CACHE_SIZE:
+            self._threads.popitem(last=False)
+    
+    async def _forget_thread(self, session_id: str, assistant_id: Optional[str] = None):
+        """세션 thread 매핑 삭제 (메모리 + thread_store, lock은 사용 중인 요청이 끝나면 자동 삭제)"""
+        for key in [key for key in self._threads if key[0] == session_id and assistant_id in (None, key[1])]:
+            del self._threads[key]
+        if self.thread_store is not None:
+            try:
+                await self.thread_store.delete(session_id, assistant_id)
+            except Exception as e:
+                print(f"⚠️ 세션 thread 삭제 실패: {e}")
+    
+    @asynccontextmanager
+    async def _thread_lock(self, assistant_id: str, session_id: Optional[str]):
+        """세션 thread용 lock (세션이 없으면 공유할 thread가 없으므로 잠그지 않음)"""
+        if session_id is None:
+            yield
+            return
+        
+        key = (session_id, assistant_id)
+        entry = self._thread_locks.get(key)
+        if entry is None:
+            entry = self._thread_locks[key] = [asyncio.Lock(), 0]
+        # 기다리는 요청까지 세어, 누군가 쓰는 동안에는 lock이 교체되지 않도록 함
+        entry[1] += 1
         try:
-            from openai import AsyncOpenAI
-            return AsyncOpenAI(api_key=self.api_key)
-        except ImportError:
-            # 구버전 openai (< 1.0.0) 대응
-            openai.api_key = self.api_key
-            return openai
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._thread_locks[key]
+    
+    async def reset_thread(self, session_id: str):
+        """세션의 Assistant thread 매핑 삭제 (다음 채팅부터 새 대화로 시작)"""
+        await self._forget_thread(session_id)
+    
+    def _response_cache_key(self, **prompt) -> str:
+        """
+        응답 캐시 키 (모델, Assistant ID와 프롬프트 구성 요소의 SHA-256)
+        
+        공백 차이만 있는 프롬프트가 같은 키가 되도록 문자열은 공백을 정규화합니다.
+        """
+        prompt = {
+            key: " ".join(value.split()) if isinstance(value, str) else value
+            for key, value in prompt.items()
+        }
+        prompt["model"] = self.CHAT_MODEL
+        prompt["version"] = self.RESPONSE_CACHE_VERSION
+        payload = json.dumps(prompt, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def _cached_chat(self, **chat_kwargs) -> dict:
+        """
+        같은 프롬프트의 응답(텍스트 + TTS audio_url)을 재사용하는 chat 호출
+        
+        메모리 LRU를 먼저 확인하고, 없으면 response_store(MongoDB)를 확인합니다.
+        """
+        assistant_id = self._get_assistant_id(chat_kwargs.get("character_id"), chat_kwargs.get("character_name"))
+        
+        # chat()이 실제로 보내는 만큼만 페이지 내용을 키에 포함 (_build_chat_messages와 같은 조건)
+        current_page_text = chat_kwargs.get("current_page_text")
+        if current_page_text and not assistant_id and chat_kwargs.get("trim_page_context", True):
+            current_page_text = current_page_text[-self.PAGE_CONTEXT_MAX_CHARS:]
+        
+        key = self._response_cache_key(
+            assistant_id=assistant_id,
+            character_id=chat_kwargs.get("character_id"),
+            character_name=chat_kwargs.get("character_name"),
+            system_prompt=chat_kwargs.get("system_prompt"),
+            message=chat_kwargs.get("message"),
+            current_page_text=current_page_text,
+        )
+        
+        cached = self._response_cache.get(key)
+        if cached is None and self.response_store is not None:
+            try:
+                cached = await self.response_store.get(key)
+            except Exception as e:
+                print(f"⚠️ LLM 응답 캐시 조회 실패: {e}")
+        if cached is not None:
+            self._remember_response(key, cached)
+            return dict(cached)
+        
+        result = await self.chat(**chat_kwargs)
+        
+        # TTS가 요청됐는데 실패한 응답은 캐시하지 않음 (다음 호출에서 다시 생성)
+        if chat_kwargs.get("tts_callback") is not None and not result.get("audio_url"):
+            return result
+        
+        response = {"text": result["text"], "audio_url": result.get("audio_url"), "audio_urls": result.get("audio_urls", [])}
+        self._remember_response(key, response)
+        if self.response_store is not None:
+            try:
+                await self.response_store.set(key, response)
+            except Exception as e:
+                print(f"⚠️ LLM 응답 캐시 저장 실패: {e}")
+        return result
+    
+    def _remember_response(self, key: str, response: dict):
+        """메모리 LRU에 응답 저장 (RESPONSE_CACHE_SIZE 초과 시 가장 오래된 항목 제거)"""
+        self._response_cache[key] = response
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
     
     def _get_assistant_id(self, character_id: Optional[str] = None, character_name: Optional[str] = None) -> Optional[str]:
         """캐릭터 이름 또는 ID로 Assistant ID 가져오기"""
-        if character_name:
-            # character_name을 소문자로 변환하여 매핑
-            name_lower = character_name.lower()
-            for key, assistant_id in self.ASSISTANT_IDS.items():
-                if key in name_lower or name_lower in key:
-                    return assistant_id
-        
-        if character_id:
-            # character_id에서도 확인 (예: "varesa_voice" 같은 형식)
-            id_lower = character_id.lower()
-            for key, assistant_id in self.ASSISTANT_IDS.items():
-                if key in id_lower:
-                    return assistant_id
+        return self._resolve_assistant_id(character_id, character_name)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _resolve_assistant_id(character_id: Optional[str], character_name: Optional[str]) -> Optional[str]:
+        """
+        (character_id, character_name) -> Assistant ID (결과를 캐시)
+        
+        ASSISTANT_IDS를 런타임에 수정하면 _resolve_assistant_id.cache_clear()를 호출해야 합니다.
+        """
+        norm_ids = LLMService._NORM_ASSISTANT_IDS
+        candidates = [value.lower() for value in (character_id, character_name) if value]
+        
+        # 1. ID, 이름 순으로 정확히 일치하는 키
+        for value in candidates:
+            assistant_id = norm_ids.get(value)
+            if assistant_id:
+                return assistant_id
+        
+        # 2. 키가 포함된 경우 (예: "varesa_voice"), 긴 키 우선
+        for value in candidates:
+            for key in LLMService._SORTED_ASSISTANT_KEYS:
+                if key in value:
+                    return norm_ids[key]
         
         return None
     
+    def _build_chat_messages(
+        self,
+        message: str,
+        system_prompt: Optional[str] = None,
+        character_name: Optional[str] = None,
+        current_page_text: Optional[str] = None,
+        trim_page_context: bool = True
+    ) -> list[dict]:
+        """Chat Completions용 messages 구성"""
+        # 시스템 프롬프트는 고정 문자열만 사용 (서버 측 prefix 캐시 적중)
+        if not system_prompt:
+            system_prompt = self.DEFAULT_SYSTEM_PROMPT
+        
+        # 페이지 내용, 캐릭터 설정처럼 매번 바뀌는 부분은 user 메시지에 배치
+        user_content = message
+        if current_page_text:
+            # 페이지 전체 대신 최근 부분만 포함 (토큰 절약, 호출자가 구성한 문맥은 그대로)
+            if trim_page_context:
+                current_page_text = current_page_text[-self.PAGE_CONTEXT_MAX_CHARS:]
+            user_content = f"현재 동화책 페이지 내용:\n{current_page_text}\n\n{user_content}"
+        if character_name:
+            user_content += f"\n\n{character_name} 캐릭터의 성격으로 대답해주세요."
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+    
     async def chat(
         self,
         message: str,
@@ -81,7 +348,11 @@ class LLMService:
         system_prompt: Optional[str] = None,
         return_audio: bool = True,
         tts_callback=None,  # TTS 생성 콜백 함수 (tts_api에서 전달)
-        current_page_text: Optional[str] = None  # 현재 동화책 페이지 내용
+        current_page_text: Optional[str] = None,  # 현재 동화책 페이지 내용
+        session_id: Optional[str] = None,  # 대화 세션 ID (같은 세션은 Assistant thread 재사용)
+        trim_page_context: bool = True,  # Chat Completions 폴백에서 페이지 내용을 최근 부분만 보낼지
+        tts_prefetch_callback=None,  # LLM 응답을 기다리는 동안 TTS 준비 콜백 (tts_api에서 전달)
+        tts_combine_callback=None  # 문장별 오디오를 하나로 잇는 콜백 (tts_api에서 전달)
     ) -> dict:
         """
         LLM과 채팅
@@ -93,137 +364,239 @@ class LLMService:
             system_prompt: 시스템 프롬프트
             return_audio: TTS 오디오 생성 여부
             tts_callback: TTS 생성 콜백 함수 (text, character_id) -> audio_url
+            session_id: 대화 세션 ID (없으면 매번 새 thread 생성)
+            trim_page_context: False면 current_page_text를 자르지 않음 (질문/마무리처럼 호출자가 문맥을 구성한 경우)
+            tts_prefetch_callback: (character_id) -> awaitable, LLM 호출과 동시에 실행 (예: 임베딩 로드)
+            tts_combine_callback: (audio_urls, character_id) -> audio_url, 문장별 오디오를 하나로 이음
             
         Returns:
-            {"text": str, "audio_url": Optional[str]}
+            {"text": str, "audio_url": Optional[str], "audio_urls": List[str]}
+            audio_url은 응답 전체 오디오, audio_urls는 문장별 오디오 (순서대로 재생하면 audio_url과 같음)
         """
         if not OPENAI_AVAILABLE:
             raise RuntimeError("OpenAI 패키지가 설치되지 않았습니다.")
         
         client = self._get_openai_client()
         
-        # Assistant ID 확인
-        assistant_id = self._get_assistant_id(character_id, character_name)
+        # 문장별 TTS 작업 (스트리밍 중 문장이 완성될 때마다 시작)
+        tts_enabled = bool(return_audio and character_id and tts_callback)
+        tts_tasks: list[asyncio.Task] = []
         
-        if assistant_id:
-            # Assistant API 사용
-            try:
-                from openai import AsyncOpenAI
-                
-                # Thread 생성
-                thread = await client.beta.threads.create()
-                
-                # 현재 페이지 내용이 있으면 메시지에 추가
-                full_message = message
-                if current_page_text:
-                    full_message = f"현재 동화책 페이지 내용:\n{current_page_text}\n\n{message}"
+        def start_sentence_tts(sentence: str):
+            sentence = sentence.strip()
+            if tts_enabled and sentence:
+                tts_tasks.append(asyncio.create_task(tts_callback(sentence, character_id)))
+        
+        # TTS 준비(임베딩 로드 등)는 LLM 응답을 기다리는 동안 미리 시작
+        prefetch_task = None
+        if tts_enabled and tts_prefetch_callback is not None:
+            prefetch_task = asyncio.create_task(tts_prefetch_callback(character_id))
+        
+        try:
+            # Assistant ID 확인
+            assistant_id = self._get_assistant_id(character_id, character_name)
+        
+            if assistant_id:
+                # Assistant API 사용
+                try:
+                    async with self._thread_lock(assistant_id, session_id):
+                        # Thread 조회 (세션이 있으면 기존 thread 재사용)
+                        thread_id = await self._get_thread_id(client, assistant_id, session_id)
+                    
+                        # 현재 페이지 내용이 있으면 메시지에 추가
+                        full_message = message
+                        if current_page_text:
+                            full_message = f"현재 동화책 페이지 내용:\n{current_page_text}\n\n{message}"
                 
-                # 메시지 추가
-                await client.beta.threads.messages.create(
-                    thread_id=thread.id,
-                    role="user",
-                    content=full_message
-                )
+                        # 메시지 추가
+                        await client.beta.threads.messages.create(
+                            thread_id=thread_id,
+                            role="user",
+                            content=full_message
+                        )
                 
-                # Run 생성 및 실행
-                run = await client.beta.threads.runs.create(
-                    thread_id=thread.id,
-                    assistant_id=assistant_id
-                )
+                        # Run 생성 및 실행 (system_prompt는 이번 Run에만 적용되는 추가 지시로 전달)
+                        run_kwargs = {"additional_instructions": system_prompt} if system_prompt else {}
+                        run = await client.beta.threads.runs.create(
+                            thread_id=thread_id,
+                            assistant_id=assistant_id,
+                            **run_kwargs
+                        )
                 
-                # Run 완료 대기
-                import asyncio
-                while run.status in ["queued", "in_progress"]:
-                    await asyncio.sleep(0.5)
-                    run = await client.beta.threads.runs.retrieve(
-                        thread_id=thread.id,
-                        run_id=run.id
-                    )
+                        # Run 완료 대기 (짧은 Run은 빨리 확인하고, 긴 Run은 폴링 횟수를 줄임)
+                        # jitter로 여러 사용자의 폴링 시점이 겹치지 않도록 분산
+                        delay = self.RUN_POLL_INITIAL_DELAY
+                        while run.status in ["queued", "in_progress"]:
+                            await asyncio.sleep(delay + random.uniform(0, delay * self.RUN_POLL_JITTER))
+                            delay = min(delay * self.RUN_POLL_BACKOFF, self.RUN_POLL_MAX_DELAY)
+                            run = await client.beta.threads.runs.retrieve(
+                                thread_id=thread_id,
+                                run_id=run.id
+                            )
                 
-                if run.status == "completed":
-                    # 메시지 가져오기 (최신순)
-                    messages = await client.beta.threads.messages.list(
-                        thread_id=thread.id,
-                        order="desc"
-                    )
-                    # 가장 최근 어시스턴트 메시지 찾기
-                    llm_text = None
-                    for msg in messages.data:
-                        if msg.role == "assistant" and msg.content:
-                            # content는 리스트이고, 각 항목은 TextContentBlock
-                            for content_block in msg.content:
-                                # content_block은 TextContentBlock 객체
-                                if hasattr(content_block, "text"):
-                                    # text 속성이 Text 객체
-                                    if hasattr(content_block.text, "value"):
-                                        llm_text = content_block.text.value
+                        if run.status == "completed":
+                            # 메시지 가져오기 (최신순)
+                            messages = await client.beta.threads.messages.list(
+                                thread_id=thread_id,
+                                order="desc"
+                            )
+                            # 가장 최근 어시스턴트 메시지 찾기
+                            llm_text = None
+                            for msg in messages.data:
+                                if msg.role == "assistant" and msg.content:
+                                    # content는 리스트이고, 각 항목은 TextContentBlock
+                                    for content_block in msg.content:
+                                        # content_block은 TextContentBlock 객체
+                                        if hasattr(content_block, "text"):
+                                            # text 속성이 Text 객체
+                                            if hasattr(content_block.text, "value"):
+                                                llm_text = content_block.text.value
+                                                break
+                                        elif isinstance(content_block, dict):
+                                            # 딕셔너리 형태인 경우
+                                            if "text" in content_block and isinstance(content_block["text"], dict):
+                                                llm_text = content_block["text"].get("value")
+                                                break
+                                    if llm_text:
                                         break
-                                elif isinstance(content_block, dict):
-                                    # 딕셔너리 형태인 경우
-                                    if "text" in content_block and isinstance(content_block["text"], dict):
-                                        llm_text = content_block["text"].get("value")
-                                        break
-                            if llm_text:
-                                break
                     
-                    if not llm_text:
-                        raise RuntimeError("Assistant 응답을 찾을 수 없습니다.")
-                else:
-                    raise RuntimeError(f"Assistant 실행 실패: {run.status}")
+                            if not llm_text:
+                                raise RuntimeError("Assistant 응답을 찾을 수 없습니다.")
+                        else:
+                            raise RuntimeError(f"Assistant 실행 실패: {run.status}")
                     
-            except Exception as e:
-                print(f"⚠️ Assistant API 호출 실패, 일반 Chat API로 폴백: {e}")
-                # Assistant API 실패 시 일반 Chat API로 폴백
-                assistant_id = None
-        
-        if not assistant_id:
-            # 일반 Chat Completions API 사용 (Assistant ID가 없거나 실패한 경우)
-            # 시스템 프롬프트 설정
-            if not system_prompt:
-                system_prompt = "당신은 친절한 동화 작가입니다."
-            if character_name:
-                system_prompt += f" {character_name} 캐릭터의 성격으로 대답해주세요."
-            
-            # 현재 페이지 내용이 있으면 시스템 프롬프트에 추가
-            if current_page_text:
-                system_prompt += f"\n\n현재 동화책 페이지 내용:\n{current_page_text}"
-            
-            try:
-                from openai import AsyncOpenAI
-                response = await client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=150  # 1-2문장 제한을 위해 토큰 수 감소
-                )
-                llm_text = response.choices[0].message.content
-            except (ImportError, AttributeError):
-                # 구버전 openai (< 1.0.0) 대응
-                response = await openai.ChatCompletion.acreate(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": message}
-                    ],
-                    temperature=0.7,
-                    max_tokens=150  # 1-2문장 제한을 위해 토큰 수 감소
+                except Exception as e:
+                    print(f"⚠️ Assistant API 호출 실패, 일반 Chat API로 폴백: {e}")
+                    # 실패한 thread는 다음 호출에서 재사용하지 않음
+                    if session_id is not None:
+                        await self._forget_thread(session_id, assistant_id)
+                    # Assistant API 실패 시 일반 Chat API로 폴백
+                    assistant_id = None
+        
+            if not assistant_id:
+                # 일반 Chat Completions API 사용 (Assistant ID가 없거나 실패한 경우)
+                messages = self._build_chat_messages(
+                    message, system_prompt, character_name, current_page_text, trim_page_context
                 )
-                llm_text = response.choices[0].message.content
+            
+                if self._legacy_openai:
+                    # 구버전 openai (< 1.0.0) 대응 (스트리밍 없이 한 번에)
+                    response = await client.ChatCompletion.acreate(
+                        model=self.CHAT_MODEL,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=150  # 1-2문장 제한을 위해 토큰 수 감소
+                    )
+                    llm_text = response.choices[0].message.content
+                else:
+                    # 토큰을 스트리밍으로 받아 문장이 끝날 때마다 TTS를 시작 (LLM 생성과 TTS 합성이 겹침)
+                    stream = await client.chat.completions.create(
+                        model=self.CHAT_MODEL,
+                        messages=messages,
+                        temperature=0.7,
+                        max_tokens=150,  # 1-2문장 제한을 위해 토큰 수 감소
+                        stream=True
+                    )
+                    text_parts = []
+                    pending = ""
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content or ""
+                        text_parts.append(delta)
+                        pending += delta
+                        sentences = self.SENTENCE_PATTERN.findall(pending)
+                        for sentence in sentences:
+                            start_sentence_tts(sentence)
+                        pending = pending[sum(len(sentence) for sentence in sentences):]
+                    start_sentence_tts(pending)
+                    llm_text = "".join(text_parts)
+        except BaseException:
+            # LLM 호출이 실패하면 이미 시작한 TTS 작업을 정리 (실패한 요청의 GPU 합성 중단, 미회수 예외 경고 방지)
+            started_tasks = [task for task in (prefetch_task, *tts_tasks) if task is not None]
+            for task in started_tasks:
+                task.cancel()
+            await asyncio.gather(*started_tasks, return_exceptions=True)
+            raise
+        
+        # 응답 content가 None인 경우(거절, 빈 응답 등)에도 문장 분리/반환이 실패하지 않도록
+        llm_text = llm_text or ""
         
         audio_url = None
+        audio_urls = []
         
-        # TTS 생성 (요청된 경우)
-        if return_audio and character_id and tts_callback:
-            try:
-                audio_url = await tts_callback(llm_text, character_id)
-            except Exception as e:
-                print(f"⚠️ TTS 생성 실패: {e}")
-                # TTS 실패해도 텍스트는 반환
+        # TTS 생성 (요청된 경우) - 스트리밍하지 않은 경로도 문장별로 나눠 동시에 생성
+        if tts_enabled:
+            if not tts_tasks:
+                sentences = self.SENTENCE_PATTERN.findall(llm_text)
+                for sentence in sentences:
+                    start_sentence_tts(sentence)
+                start_sentence_tts(llm_text[sum(len(sentence) for sentence in sentences):])
+            if prefetch_task is not None:
+                await asyncio.gather(prefetch_task, return_exceptions=True)
+            sentence_failed = False
+            for result in await asyncio.gather(*tts_tasks, return_exceptions=True):
+                if isinstance(result, Exception):
+                    print(f"⚠️ 문장 TTS 생성 실패: {result}")
+                    sentence_failed = True
+                else:
+                    audio_urls.append(result)
+            if tts_tasks:
+                audio_url, audio_urls = await self._full_reply_audio(
+                    llm_text, character_id, audio_urls, sentence_failed, tts_callback, tts_combine_callback
+                )
         
-        return {"text": llm_text, "audio_url": audio_url}
+        return {"text": llm_text, "audio_url": audio_url, "audio_urls": audio_urls}
+    
+    async def _full_reply_audio(
+        self,
+        llm_text: str,
+        character_id: str,
+        audio_urls: list[str],
+        sentence_failed: bool,
+        tts_callback,
+        tts_combine_callback=None
+    ) -> tuple[Optional[str], list[str]]:
+        """
+        문장별 TTS 결과로 응답 전체의 audio_url 구성
+        
+        문장이 하나면 그대로 쓰고, 여러 개면 tts_combine_callback으로 이어 붙입니다.
+        일부 문장이 실패했거나 이어 붙일 수 없으면 전체 텍스트를 한 번에 합성하고
+        audio_urls도 그 파일 하나로 바꿔 빠진 문장이 없도록 합니다.
+        
+        Returns:
+            (audio_url, audio_urls) - TTS가 모두 실패하면 (None, [])
+        """
+        if not sentence_failed:
+            if len(audio_urls) == 1:
+                return audio_urls[0], audio_urls
+            if tts_combine_callback is not None:
+                try:
+                    return await tts_combine_callback(audio_urls, character_id), audio_urls
+                except Exception as e:
+                    print(f"⚠️ 문장 오디오 합치기 실패, 전체 텍스트로 다시 생성: {e}")
+        
+        try:
+            audio_url = await tts_callback(llm_text, character_id)
+        except Exception as e:
+            # TTS 실패해도 텍스트는 반환
+            print(f"⚠️ TTS 생성 실패: {e}")
+            return None, []
+        return audio_url, [audio_url]
+    
+    @staticmethod
+    def _question_prompt(page_text: str, full_story_text: Optional[str] = None, page=None) -> tuple[str, str]:
+        """질문 생성용 (메시지, 페이지 문맥) - generate_question과 generate_questions_batch 공용"""
+        # 페이지 정보 포함
+        page_info = f" (페이지 {page})" if page else ""
+        
+        question_prompt = f"위 동화{page_info} 내용에 맞는 질문을 하나 만들어주세요."
+        
+        # 1페이지부터 해당 페이지까지의 텍스트가 있으면 추가
+        context_text = page_text
+        if full_story_text:
+            context_text = f"지금까지의 동화 내용 (1페이지부터 {page}페이지까지):\n{full_story_text}\n\n현재 페이지 ({page}페이지) 내용:\n{page_text}"
+        return question_prompt, context_text
     
     async def generate_question(
         self,
@@ -233,7 +606,9 @@ class LLMService:
         story_title: Optional[str] = None,
         tts_callback=None,
         full_story_text: Optional[str] = None,  # 1페이지부터 해당 페이지까지의 텍스트 (선택)
-        page: Optional[str] = None  # 페이지 숫자 (string)
+        page: Optional[str] = None,  # 페이지 숫자 (string)
+        use_cache: bool = True,  # 같은 프롬프트의 이전 응답 재사용
+        tts_combine_callback=None
     ) -> dict:
         """
         페이지 텍스트를 기반으로 질문 생성
@@ -244,35 +619,25 @@ class LLMService:
             character_name: 캐릭터 이름
             story_title: 동화 제목
             tts_callback: TTS 생성 콜백 함수
+            use_cache: False면 캐시를 건너뛰고 항상 새로 생성
+            tts_combine_callback: 문장별 오디오를 하나로 잇는 콜백 (chat 참고)
             
         Returns:
-            {"text": str, "audio_url": Optional[str]}
+            {"text": str, "audio_url": Optional[str], "audio_urls": List[str]}
         """
-        # 페이지 정보 포함
-        page_info = f" (페이지 {page})" if page else ""
-        
-        question_prompt = f"""다음 동화{page_info} 내용을 읽고, 이 페이지의 내용에 맞는 질문을 하나 만들어주세요.
-질문은:
-- 이 페이지에서 나온 내용을 바탕으로 해야 합니다
-- 아이가 이해하기 쉽고 간단해야 합니다
-- 동화의 흐름을 이해하는데 도움이 되어야 합니다
-- 아이의 창의성을 기르는데 도움이 되어야 합니다.
-- 질문만 답변해주세요. 다른 설명은 필요 없습니다.
-- 질문은 반드시 1문장으로만 만들어주세요.
-"""
+        question_prompt, context_text = self._question_prompt(page_text, full_story_text, page)
         
-        # 1페이지부터 해당 페이지까지의 텍스트가 있으면 추가
-        context_text = page_text
-        if full_story_text:
-            context_text = f"지금까지의 동화 내용 (1페이지부터 {page}페이지까지):\n{full_story_text}\n\n현재 페이지 ({page}페이지) 내용:\n{page_text}"
-        
-        return await self.chat(
+        chat = self._cached_chat if use_cache else self.chat
+        return await chat(
             message=question_prompt,
+            system_prompt=self.QUESTION_SYSTEM_PROMPT,
             character_id=character_id,
             character_name=character_name,
             return_audio=True,
             tts_callback=tts_callback,
-            current_page_text=context_text
+            tts_combine_callback=tts_combine_callback,
+            current_page_text=context_text,
+            trim_page_context=False  # 이전 페이지 내용과 헤더를 잘라내지 않음
         )
     
     async def generate_closing_message(
@@ -281,7 +646,9 @@ class LLMService:
         story_summary: str,
         character_id: str,
         character_name: Optional[str] = None,
-        tts_callback=None
+        tts_callback=None,
+        use_cache: bool = True,  # 같은 프롬프트의 이전 응답 재사용
+        tts_combine_callback=None
     ) -> dict:
         """
         동화 마무리 멘트 생성
@@ -292,26 +659,115 @@ class LLMService:
             character_id: 캐릭터 ID
             character_name: 캐릭터 이름
             tts_callback: TTS 생성 콜백 함수
+            use_cache: False면 캐시를 건너뛰고 항상 새로 생성
+            tts_combine_callback: 문장별 오디오를 하나로 잇는 콜백 (chat 참고)
             
         Returns:
-            {"text": str, "audio_url": Optional[str]}
+            {"text": str, "audio_url": Optional[str], "audio_urls": List[str]}
         """
-        closing_prompt = f"""다음 동화를 읽고, 아이에게 동화를 마무리하는 따뜻한 멘트를 해주세요.
-멘트는 1-2문장으로 간단하고 따뜻해야 합니다.
-멘트만 답변해주세요. 다른 설명은 필요 없습니다.
-
-동화 제목: {story_title}
-"""
+        closing_prompt = f"동화 제목: {story_title}\n위 동화를 마무리하는 멘트를 해주세요."
         
         # 동화 내용을 current_page_text로 전달
         story_content = story_summary[:500] + ('...' if len(story_summary) > 500 else '')
         
-        return await self.chat(
+        chat = self._cached_chat if use_cache else self.chat
+        return await chat(
             message=closing_prompt,
+            system_prompt=self.CLOSING_SYSTEM_PROMPT,
             character_id=character_id,
             character_name=character_name,
             return_audio=True,
             tts_callback=tts_callback,
-            current_page_text=f"동화 내용: {story_content}"
+            tts_combine_callback=tts_combine_callback,
+            current_page_text=f"동화 내용: {story_content}",
+            trim_page_context=False  # story_content는 이미 500자로 잘려 있음
         )
-
+    
+    async def generate_questions_batch(
+        self,
+        pages: list[dict],
+        character_name: Optional[str] = None
+    ) -> list[dict]:
+        """
+        여러 페이지의 질문을 OpenAI Batch API 작업 하나로 생성 (동화 사전 준비용)
+        
+        페이지마다 온라인 호출을 하는 대신 요청을 JSONL로 묶어 한 번에 제출합니다.
+        결과는 최대 24시간 안에 나오므로 실시간 대화에는 generate_question을 사용하세요.
+        프롬프트는 generate_question의 Chat Completions 경로와 같고, TTS는 생성하지 않습니다.
+        (오프라인 준비 스크립트용 라이브러리 함수로, API 엔드포인트는 없습니다.)
+        
+        Args:
+            pages: [{"page": 1, "text": "...", "full_story_text": "..."(선택)}, ...]
+            character_name: 캐릭터 이름
+            
+        Returns:
+            [{"page": 1, "text": str}, ...] (실패한 페이지는 "text" 대신 "error")
+        """
+        if not OPENAI_AVAILABLE:
+            raise RuntimeError("OpenAI 패키지가 설치되지 않았습니다.")
+        
+        client = self._get_openai_client()
+        if self._legacy_openai:
+            raise RuntimeError("Batch API는 openai>=1.0.0에서만 사용할 수 있습니다.")
+        
+        # custom_id = 페이지 인덱스 (결과는 순서가 보장되지 않으므로 이 값으로 매핑)
+        lines = []
+        for idx, page in enumerate(pages):
+            question_prompt, context_text = self._question_prompt(
+                page["text"], page.get("full_story_text"), page.get("page")
+            )
+            messages = self._build_chat_messages(
+                question_prompt,
+                self.QUESTION_SYSTEM_PROMPT,
+                character_name,
+                context_text,
+                trim_page_context=False  # generate_question과 같은 문맥 사용
+            )
+            lines.append(json.dumps({
+                "custom_id": str(idx),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.CHAT_MODEL,
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": 150
+                }
+            }, ensure_ascii=False))
+        
+        input_file = await client.files.create(
+            file=("questions.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"📦 질문 생성 Batch 제출: {batch.id} ({len(pages)} pages)")
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(self.BATCH_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+        
+        results: list[dict] = [
+            {"page": page.get("page"), "error": f"Batch {batch.status}"} for page in pages
+        ]
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                idx = int(item["custom_id"])
+                response = item.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[idx] = {
+                        "page": pages[idx].get("page"),
+                        "text": response["body"]["choices"][0]["message"]["content"]
+                    }
+                else:
+                    results[idx] = {"page": pages[idx].get("page"), "error": str(item.get("error") or response)}
+        
+        print(f"✅ 질문 생성 Batch 완료: {batch.id} ({batch.status})")
+        return results
@@ -1,76 +1,187 @@
 """문장에서 감정을 자동으로 감지하는 유틸리티."""
 
 import re
+from functools import lru_cache
+from typing import Sequence, Union
 
+import numpy as np
 
-def detect_emotion_from_text(text: str) -> list[float]:
+# 키워드 한 번 스캔 (선택사항 - 없으면 감정별 정규식으로 폴백)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# 점수 정규화 JIT 컴파일 (선택사항 - 없으면 같은 코드를 numpy로 실행)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """numba가 없을 때 데코레이터를 그대로 통과"""
+        return lambda func: func
+
+
+# 감정 키워드 (기쁨, 슬픔, 공포, 분노, 놀람 순서 = _EMOTION_KEYWORDS 인덱스)
+_EMOTION_KEYWORDS = (
+    ('웃', '기쁨', '행복', '좋', '신나', '즐거', '하하', '히히'),  # 기쁨
+    ('슬프', '울', '눈물', '아프', '힘들', '외로'),  # 슬픔
+    ('무서', '두렵', '겁', '살려', '도망', '위험'),  # 공포
+    ('화', '짜증', '싫어', '미워', '나쁜'),  # 분노
+    ('놀라', '깜짝', '어머', '세상에', '!', '?'),  # 놀람
+)
+
+
+def _build_keyword_automaton():
+    """모든 키워드를 담은 Aho-Corasick 오토마톤 (값: (감정 인덱스, 키워드))"""
+    automaton = ahocorasick.Automaton()
+    for emotion_index, keywords in enumerate(_EMOTION_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, (emotion_index, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+# 키워드 첫 글자 중 하나라도 있는지 확인하는 문자 클래스 (없으면 키워드 매치가 불가능 → 바로 중립)
+_KEYWORD_FIRST_CHARS_PATTERN = re.compile(
+    "[" + "".join(sorted({re.escape(keyword[0]) for keywords in _EMOTION_KEYWORDS for keyword in keywords})) + "]"
+)
+
+# 감정별 키워드 alternation 정규식 (import 시 한 번만 컴파일)
+# lookahead로 감싸 모든 위치에서 매치를 찾으므로 겹치는 키워드도 놓치지 않음
+_EMOTION_PATTERNS = tuple(
+    re.compile("(?=(" + "|".join(map(re.escape, sorted(keywords, key=len, reverse=True))) + "))")
+    for keywords in _EMOTION_KEYWORDS
+)
+
+
+def _count_emotion_keywords(text_lower: str) -> list[int]:
+    """감정별로 텍스트에 등장한 서로 다른 키워드 수"""
+    scores = [0] * len(_EMOTION_KEYWORDS)
+    if _KEYWORD_AUTOMATON is not None:
+        # 텍스트를 한 번만 훑으면서 모든 키워드 매치를 찾음 (같은 키워드는 한 번만 셈)
+        for emotion_index, keyword in {value for _, value in _KEYWORD_AUTOMATON.iter(text_lower)}:
+            scores[emotion_index] += 1
+    else:
+        for emotion_index, pattern in enumerate(_EMOTION_PATTERNS):
+            scores[emotion_index] = len(set(pattern.findall(text_lower)))
+    return scores
+
+
+# 이 길이를 넘으면 느낌표를 numpy 바이트 비교로 셈 (짧은 문장은 인코딩 비용이 더 큼)
+_BYTE_COUNT_MIN_LENGTH = 256
+_EXCLAMATION_BYTE = ord('!')
+
+
+def _count_exclamations(text: str) -> int:
+    """느낌표 수 ('!'는 ASCII라 UTF-8 바이트 수와 글자 수가 같음)"""
+    if len(text) <= _BYTE_COUNT_MIN_LENGTH:
+        return text.count('!')
+    buf = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+    return int(np.count_nonzero(buf == _EXCLAMATION_BYTE))
+
+
+def detect_emotion_from_text(text: str, as_list: bool = False) -> Union[np.ndarray, list[float]]:
     """
     텍스트 내용을 분석해 적절한 감정 벡터를 반환합니다.
     
+    Args:
+        text: 분석할 문장
+        as_list: True면 기존처럼 list[float] 반환
+    
     Returns:
-        [기쁨, 슬픔, 혐오, 공포, 놀람, 분노, 기타, 중립]
+        [기쁨, 슬픔, 혐오, 공포, 놀람, 분노, 기타, 중립] float32 배열
+        (torch.from_numpy로 복사 없이 텐서 변환 가능)
     """
     text_lower = text.lower()
     
-    # 감정 키워드 매칭
-    joy_keywords = ['웃', '기쁨', '행복', '좋', '신나', '즐거', '하하', '히히']
-    sad_keywords = ['슬프', '울', '눈물', '아프', '힘들', '외로']
-    fear_keywords = ['무서', '두렵', '겁', '살려', '도망', '위험']
-    anger_keywords = ['화', '짜증', '싫어', '미워', '나쁜']
-    surprise_keywords = ['놀라', '깜짝', '어머', '세상에', '!', '?']
-    
-    # 점수 계산
-    joy_score = sum(1 for kw in joy_keywords if kw in text_lower)
-    sad_score = sum(1 for kw in sad_keywords if kw in text_lower)
-    fear_score = sum(1 for kw in fear_keywords if kw in text_lower)
-    anger_score = sum(1 for kw in anger_keywords if kw in text_lower)
-    surprise_score = sum(1 for kw in surprise_keywords if kw in text_lower)
+    # 키워드가 하나도 있을 수 없는 문장은 점수 계산 없이 중립 반환
+    if _KEYWORD_FIRST_CHARS_PATTERN.search(text_lower) is None:
+        emotions = _NEUTRAL_VECTOR.copy()
+        return emotions.tolist() if as_list else emotions
     
-    # 느낌표/물음표 카운트
-    exclaim_count = text.count('!')
-    question_count = text.count('?')
+    # 감정 키워드 매칭 및 점수 계산
+    joy_score, sad_score, fear_score, anger_score, surprise_score = _count_emotion_keywords(text_lower)
     
+    # 느낌표 수를 반영해 점수 보정 및 정규화
+    emotions = _finalize_emotion_scores(
+        joy_score, sad_score, fear_score, anger_score, surprise_score, _count_exclamations(text)
+    )
+    return emotions.tolist() if as_list else emotions
+
+
+# 감정 프리셋 (모듈 로드 시 한 번만 생성, 공유되므로 tuple로 고정)
+_PRESETS: dict[str, tuple[float, ...]] = {
+    "neutral": (0.3077, 0.0256, 0.0256, 0.0256, 0.0256, 0.0256, 0.2564, 0.3077),
+    "joy": (0.8, 0.0, 0.0, 0.0, 0.1, 0.0, 0.05, 0.05),
+    "sad": (0.0, 0.8, 0.0, 0.0, 0.0, 0.0, 0.1, 0.1),
+    "fear": (0.0, 0.1, 0.0, 0.7, 0.1, 0.0, 0.05, 0.05),
+    "anger": (0.0, 0.0, 0.1, 0.0, 0.0, 0.7, 0.1, 0.1),
+    "surprise": (0.1, 0.0, 0.0, 0.0, 0.7, 0.0, 0.1, 0.1),
+}
+
+
+def _readonly_vector(values: Sequence[float]) -> np.ndarray:
+    """공유용 읽기 전용 float32 벡터"""
+    vector = np.array(values, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+# 프리셋 float32 벡터 (텐서 변환 시 매번 리스트에서 다시 만들지 않도록 공유)
+_PRESET_VECTORS: dict[str, np.ndarray] = {name: _readonly_vector(values) for name, values in _PRESETS.items()}
+_NEUTRAL_VECTOR = _PRESET_VECTORS["neutral"]
+
+
+@lru_cache(maxsize=16)
+def get_emotion_preset(emotion_name: str) -> Sequence[float]:
+    """감정 이름으로 프리셋 벡터 반환 (공유 tuple, 수정이 필요하면 list()로 복사)."""
+    return _PRESETS.get(emotion_name.lower(), _PRESETS["neutral"])
+
+
+def get_emotion_preset_vector(emotion_name: str) -> np.ndarray:
+    """감정 이름으로 프리셋 float32 벡터 반환 (공유 읽기 전용 배열, 수정이 필요하면 .copy())."""
+    return _PRESET_VECTORS.get(emotion_name.lower(), _NEUTRAL_VECTOR)
+
+
+# 시그니처를 명시해 import 시점에 컴파일 (cache=True면 __pycache__의 디스크 캐시에서 바로 로드)
+# → 첫 요청에서 JIT 컴파일 지연이 생기지 않음
+@njit("float32[:](int64, int64, int64, int64, int64, int64)", cache=True, fastmath=True)
+def _finalize_emotion_scores(joy_score, sad_score, fear_score, anger_score, surprise_score, exclaim_count):
+    """키워드 점수 -> [기쁨, 슬픔, 혐오, 공포, 놀람, 분노, 기타, 중립] float32 벡터"""
     if exclaim_count >= 2:
         surprise_score += 2
     if fear_score > 0 and exclaim_count > 0:
         fear_score += 1
     
-    # 가장 높은 점수의 감정 선택
+    emotions = np.empty(8, dtype=np.float32)
     total = joy_score + sad_score + fear_score + anger_score + surprise_score
     
     if total == 0:
         # 감정 키워드 없음 → 중립
-        return [0.3077, 0.0256, 0.0256, 0.0256, 0.0256, 0.0256, 0.2564, 0.3077]
+        emotions[:] = _NEUTRAL_VECTOR
+        return emotions
     
     # 정규화
-    emotions = [
-        joy_score / total if total > 0 else 0.0,      # 기쁨
-        sad_score / total if total > 0 else 0.0,      # 슬픔
-        0.05,                                          # 혐오 (기본 낮음)
-        fear_score / total if total > 0 else 0.0,     # 공포
-        surprise_score / total if total > 0 else 0.0, # 놀람
-        anger_score / total if total > 0 else 0.0,    # 분노
-        0.1,                                           # 기타
-        0.1,                                           # 중립
-    ]
-    
-    # 합계가 1.0에 가깝게 조정
-    total_sum = sum(emotions)
-    if total_sum > 0:
-        emotions = [e / total_sum for e in emotions]
+    emotions[0] = joy_score / total       # 기쁨
+    emotions[1] = sad_score / total       # 슬픔
+    emotions[2] = 0.05                    # 혐오 (기본 낮음)
+    emotions[3] = fear_score / total      # 공포
+    emotions[4] = surprise_score / total  # 놀람
+    emotions[5] = anger_score / total     # 분노
+    emotions[6] = 0.1                     # 기타
+    emotions[7] = 0.1                     # 중립
     
+    # 합계가 1.0에 가깝게 조정 (total > 0이면 합계는 항상 양수)
+    emotions /= emotions.sum()
     return emotions
 
 
-def get_emotion_preset(emotion_name: str) -> list[float]:
-    """감정 이름으로 프리셋 벡터 반환."""
-    presets = {
-        "neutral": [0.3077, 0.0256, 0.0256, 0.0256, 0.0256, 0.0256, 0.2564, 0.3077],
-        "joy": [0.8, 0.0, 0.0, 0.0, 0.1, 0.0, 0.05, 0.05],
-        "sad": [0.0, 0.8, 0.0, 0.0, 0.0, 0.0, 0.1, 0.1],
-        "fear": [0.0, 0.1, 0.0, 0.7, 0.1, 0.0, 0.05, 0.05],
-        "anger": [0.0, 0.0, 0.1, 0.0, 0.0, 0.7, 0.1, 0.1],
-        "surprise": [0.1, 0.0, 0.0, 0.0, 0.7, 0.0, 0.1, 0.1],
-    }
-    return presets.get(emotion_name.lower(), presets["neutral"])
-
+if __name__ == "__main__":
+    # 배포 시 `python -m service.utils.emotion_detector`로 numba 디스크 캐시를 미리 생성
+    print(f"🔥 감정 감지 워밍업 (numba: {NUMBA_AVAILABLE}): {detect_emotion_from_text('정말 기뻐서 웃었어요!!')}")